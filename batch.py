@@ -0,0 +1,232 @@
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from main import FrameInput, Game, random_policy
+
+# Game attributes a sweep may change; weapon timers are addressed as weapon<level>.timer. Weapon damage
+# and asteroid hit points are left out: bullets destroy an asteroid outright, so they never change a game.
+TUNABLES = ["asteroid_spawn_delay", "powerup_spawn_delay", "max_asteroid_size", "asteroid_speed",
+            "spaceship_speed", "shield_duration", "power_increment"]
+
+
+def idle_policy(game):
+    # Baseline player that never moves or fires
+    return FrameInput(False, False, False, False)
+
+
+def dodge_policy(game):
+    # Scripted player: always fires and steps away from the nearest asteroid falling towards the ship
+    asteroids = game.asteroids
+    left = game.spaceship_x - 20
+    right = game.spaceship_x + game.spaceship_width + 20
+    threat = ((asteroids.x < right) & (asteroids.x + asteroids.w > left) &
+              (asteroids.y + asteroids.h > game.spaceship_y - 200) & (asteroids.y < game.spaceship_y))
+    if not threat.any():
+        return FrameInput(False, False, True, False)
+    nearest = np.argmax(np.where(threat, asteroids.y + asteroids.h, -np.inf))
+    center = asteroids.x[nearest] + asteroids.w[nearest] / 2
+    ship_center = game.spaceship_x + game.spaceship_width / 2
+    # Against a wall, go the other way even if it means passing under the asteroid
+    go_left = center > ship_center
+    if go_left and game.spaceship_x <= 0:
+        go_left = False
+    elif not go_left and game.spaceship_x >= game.screen_width - game.spaceship_width:
+        go_left = True
+    return FrameInput(go_left, not go_left, True, False)
+
+
+POLICIES = {"random": random_policy, "idle": idle_policy, "dodge": dodge_policy}
+
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_param(text):
+    # NAME=V1,V2,... -> (NAME, [V1, V2, ...])
+    name, sep, values = text.partition("=")
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... but got {text!r}")
+    return name, [parse_value(value) for value in values.split(",")]
+
+
+def known_param(name):
+    if name in TUNABLES:
+        return True
+    level, _, key = name.partition(".")
+    return level.startswith("weapon") and level[6:] in ("1", "2", "3") and key == "timer"
+
+
+def build_grid(params):
+    # Cartesian product of every parameter's values, in the order given
+    names = list(params)
+    return [dict(zip(names, values)) for values in itertools.product(*(params[name] for name in names))]
+
+
+def apply_params(game, params):
+    for name, value in params.items():
+        if name.startswith("weapon"):
+            level, _, key = name.partition(".")
+            game.weapon_levels[int(level[6:])][key] = value
+        else:
+            setattr(game, name, value)
+
+
+# Each worker process builds one display-less game and reuses it for all of its runs;
+# the tunables are put back to their defaults before every run.
+_game = None
+_defaults = None
+
+
+def init_worker():
+    global _game, _defaults
+    # SDL turns SIGTERM into a quit event by default, which would leave the pool unable to stop its workers
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    _game = Game(headless=True)
+    _defaults = {name: getattr(_game, name) for name in TUNABLES}
+    _defaults["weapon_levels"] = copy.deepcopy(_game.weapon_levels)
+
+
+def run_game(task):
+    # Play one seeded game to game over or max_frames and time every frame
+    config, params, policy_name, seed, max_frames, draw = task
+    game = _game
+    for name in TUNABLES:
+        setattr(game, name, _defaults[name])
+    game.weapon_levels = copy.deepcopy(_defaults["weapon_levels"])
+    apply_params(game, params)
+    random.seed(seed)  # The random policy draws from the global generator
+    game.reset(seed)
+    game.renderer.invalidate()
+    policy = POLICIES[policy_name]
+
+    frame_times = np.zeros(max_frames, dtype=np.float32)
+    frames = 0
+    while frames < max_frames and not game.game_over:
+        started = time.perf_counter()
+        game.step(policy(game))
+        if draw:
+            game.draw()
+        frame_times[frames] = time.perf_counter() - started
+        frames += 1
+    return {
+        "config": config,
+        "seed": seed,
+        "score": game.score,
+        "frames": frames,
+        "game_over": game.game_over,
+        "frame_times": frame_times[:frames]
+    }
+
+
+def distribution(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(np.mean(values)),
+        "min": float(np.min(values)),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(np.max(values))
+    }
+
+
+def aggregate(configs, runs):
+    # One entry per configuration, pooling all of its seeds
+    report = []
+    for index, (params, policy_name) in enumerate(configs):
+        games = [run for run in runs if run["config"] == index]
+        frame_times = np.concatenate([run["frame_times"] for run in games]) * 1000
+        report.append({
+            "params": params,
+            "policy": policy_name,
+            "games": len(games),
+            "survived": sum(not run["game_over"] for run in games),
+            "score": distribution([run["score"] for run in games]),
+            "survival_seconds": distribution([run["frames"] / 60 for run in games]),
+            "frame_ms": {
+                "mean": float(np.mean(frame_times)),
+                "p95": float(np.percentile(frame_times, 95)),
+                "p99": float(np.percentile(frame_times, 99))
+            }
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded headless Spaceship Games over a parameter grid "
+                                                 "on all cores and report score, survival and frame cost")
+    parser.add_argument("--param", action="append", type=parse_param, default=[], metavar="NAME=V1,V2,...",
+                        help="values to sweep for a game parameter, e.g. asteroid_spawn_delay=30,60,120 or "
+                             "weapon2.timer=300,600; repeat for a grid over several parameters")
+    parser.add_argument("--grid", help="JSON file mapping parameter names to lists of values")
+    parser.add_argument("--policy", action="append", choices=sorted(POLICIES),
+                        help="player policy to run every configuration with (default random); repeatable")
+    parser.add_argument("--seeds", type=int, default=20, help="seeded games per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; games use seed, seed + 1, ...")
+    parser.add_argument("--max-frames", type=int, default=60 * 60 * 5,
+                        help="stop a game that is still running after this many frames (default 5 minutes)")
+    parser.add_argument("--draw", action="store_true", help="also render every frame so frame cost includes drawing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--output", help="write the report JSON here instead of stdout")
+    args = parser.parse_args()
+
+    params = {}
+    if args.grid:
+        with open(args.grid, "r") as file:
+            params.update(json.load(file))
+    params.update(dict(args.param))
+    for name in params:
+        if not known_param(name):
+            parser.error(f"unknown parameter {name!r}; expected one of {', '.join(TUNABLES)} "
+                         f"or weapon<1-3>.timer")
+    configs = [(values, policy_name) for values in build_grid(params) for policy_name in args.policy or ["random"]]
+    tasks = [(index, values, policy_name, args.seed + n, args.max_frames, args.draw)
+             for index, (values, policy_name) in enumerate(configs) for n in range(args.seeds)]
+
+    started = time.perf_counter()
+    runs = []
+    with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+        for run in pool.imap_unordered(run_game, tasks, chunksize=max(1, len(tasks) // (args.workers * 8))):
+            runs.append(run)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "seeds": args.seeds,
+        "first_seed": args.seed,
+        "max_frames": args.max_frames,
+        "draw": args.draw,
+        "workers": args.workers,
+        "seconds": elapsed,
+        "frames": int(sum(run["frames"] for run in runs)),
+        "configs": aggregate(configs, runs)
+    }
+    for entry in report["configs"]:
+        label = " ".join(f"{name}={value}" for name, value in entry["params"].items()) or "defaults"
+        print(f"{label:<48} {entry['policy']:<7} score p50 {entry['score']['p50']:8.1f}  "
+              f"survival p50 {entry['survival_seconds']['p50']:7.1f} s  "
+              f"frame p95 {entry['frame_ms']['p95']:6.3f} ms", file=sys.stderr)
+    print(f"{len(runs)} games, {report['frames']} frames in {elapsed:.1f} s on {args.workers} workers",
+          file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import fnmatch
+import json
+import random
+import sys
+
+import numpy as np
+
+from main import FrameInput, FrameProfiler, Game
+
+PHASES = ["spawn", "move", "collide", "draw"]
+# The profiler phases each benchmark phase is made of; spawn also covers reading the
+# input and recording previous positions, draw also covers presenting the frame
+PROFILER_PHASES = {
+    "spawn": ["events", "spawn"],
+    "move": ["move"],
+    "collide": ["collide", "timers"],
+    "draw": ["draw", "present"]
+}
+
+
+def build_scenarios():
+    # Scripted scenarios: asteroid counts x (plain, shielded, each weapon level with bullets)
+    scenarios = []
+    for n_asteroids in (50, 500, 5000):
+        scenarios.append({"name": f"asteroids{n_asteroids}", "asteroids": n_asteroids, "bullets": 0,
+                          "shield": False, "weapon_level": 0})
+        scenarios.append({"name": f"asteroids{n_asteroids}-shield", "asteroids": n_asteroids, "bullets": 0,
+                          "shield": True, "weapon_level": 0})
+        for level in (1, 2, 3):
+            scenarios.append({"name": f"asteroids{n_asteroids}-weapon{level}", "asteroids": n_asteroids,
+                              "bullets": 20 * level, "shield": False, "weapon_level": level})
+    return scenarios
+
+
+def top_up(game, scenario):
+    # Keep the entity counts of a scenario constant as entities leave the screen
+    while game.asteroids.count < scenario["asteroids"]:
+        size = random.randint(10, game.max_asteroid_size)
+        game.asteroids.add(random.randint(0, game.screen_width - size), random.randint(-game.screen_height, 0),
+                           size, size, hp=game.asteroid_hp)
+    while game.bullets.count < scenario["bullets"]:
+        game.bullets.add(random.randint(0, game.screen_width - 5), random.randint(0, game.screen_height), 5, 10)
+
+
+def prepare(game, scenario, seed):
+    random.seed(seed)
+    game.reset()
+    game.power = 10 ** 6  # Nobody dies during a benchmark
+    game.shielded = scenario["shield"]
+    game.shield_time = 10 ** 9 if scenario["shield"] else 0
+    game.current_weapon_level = scenario["weapon_level"]
+    game.weapon_timer = 10 ** 9 if scenario["weapon_level"] else 0
+    game.renderer.invalidate()
+    # Spread the initial asteroids over the screen as well as above it
+    for _ in range(scenario["asteroids"]):
+        size = random.randint(10, game.max_asteroid_size)
+        game.asteroids.add(random.randint(0, game.screen_width - size),
+                           random.randint(-game.screen_height, game.screen_height), size, size,
+                           hp=game.asteroid_hp)
+    top_up(game, scenario)
+
+
+def run_scenario(game, scenario, frames, warmup, seed):
+    # Frames run through Game.step and Game.draw and are timed by the profiler's own
+    # marks, so the benchmark always measures exactly what a real tick does
+    prepare(game, scenario, seed)
+    inputs = FrameInput(False, False, False, False)
+    profiler = game.profiler
+    game.profiler = FrameProfiler(capacity=frames)
+    try:
+        for frame in range(-warmup, frames):
+            top_up(game, scenario)
+            game.game_over = False
+            game.profiler.enabled = frame >= 0
+            game.profiler.begin_frame()
+            game.step(inputs)
+            game.draw()
+            game.profiler.end_frame()
+        samples = game.profiler.recent() / 1000
+    finally:
+        game.profiler = profiler
+
+    index = {phase: i for i, phase in enumerate(FrameProfiler.PHASES)}
+    timings = {phase: samples[:, [index[name] for name in PROFILER_PHASES[phase]]].sum(axis=1)
+               for phase in PHASES}
+    timings["frame"] = samples[:, -1]
+    return {phase: summarize(values) for phase, values in timings.items()}
+
+
+def summarize(values):
+    # Milliseconds
+    values = values * 1000
+    return {
+        "mean": float(np.mean(values)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99))
+    }
+
+
+def compare(results, baseline, threshold, min_delta):
+    # Frame and phase statistics that got slower than the baseline by more than threshold;
+    # differences under min_delta milliseconds are treated as timer noise
+    regressions = []
+    for name, phases in results["scenarios"].items():
+        base_phases = baseline.get("scenarios", {}).get(name)
+        if base_phases is None:
+            continue
+        for phase, stats in phases.items():
+            for stat in ("mean", "p95", "p99"):
+                base = base_phases.get(phase, {}).get(stat)
+                if base and stats[stat] > base * (1 + threshold) and stats[stat] - base >= min_delta:
+                    regressions.append({"scenario": name, "phase": phase, "stat": stat,
+                                        "baseline": base, "current": stats[stat],
+                                        "change": stats[stat] / base - 1})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Spaceship Game update and render phases")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed frames before each scenario")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scenario", action="append",
+                        help="only run scenarios whose name matches this glob pattern, e.g. 'asteroids500-*'")
+    parser.add_argument("--output", help="write the results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown against the baseline, as a fraction (default 0.10)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many milliseconds (default 0.05)")
+    args = parser.parse_args()
+
+    game = Game(headless=True)
+    scenarios = build_scenarios()
+    if args.scenario:
+        scenarios = [s for s in scenarios if any(fnmatch.fnmatch(s["name"], pattern) for pattern in args.scenario)]
+
+    results = {"frames": args.frames, "seed": args.seed, "scenarios": {}}
+    for scenario in scenarios:
+        results["scenarios"][scenario["name"]] = run_scenario(game, scenario, args.frames, args.warmup, args.seed)
+        frame = results["scenarios"][scenario["name"]]["frame"]
+        print(f"{scenario['name']:<24} mean {frame['mean']:8.3f} ms  p95 {frame['p95']:8.3f} ms  "
+              f"p99 {frame['p99']:8.3f} ms", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        results["threshold"] = args.threshold
+        results["regressions"] = compare(results, baseline, args.threshold, args.min_delta)
+        for regression in results["regressions"]:
+            print(f"REGRESSION {regression['scenario']} {regression['phase']} {regression['stat']}: "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f} ms "
+                  f"(+{regression['change']:.0%})", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
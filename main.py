@@ -1,448 +1,1991 @@
-import json
-import pygame
-import random
-
-
-class GameInitializer:
-    def __init__(self, screen_width, screen_height):
-        # Initialize the game
-        pygame.init()
-
-        # Set up the display
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Spaceship Game")
-
-        # Define colors
-        self.BLACK = (0, 0, 0)
-        self.WHITE = (255, 255, 255)
-        self.GREEN = (0, 255, 0)
-        self.RED = (255, 0, 0)
-        self.BLUE = (0, 0, 255)
-
-        # Load images
-        self.spaceship_img = pygame.image.load("spaceship.png").convert_alpha()
-        self.spaceship_width, self.spaceship_height = self.spaceship_img.get_size()
-        self.spaceship_width = int(self.spaceship_width * 0.3)  # Reduce width by 70%
-        self.spaceship_height = int(self.spaceship_height * 0.3)  # Reduce height by 70%
-        self.spaceship_img = pygame.transform.scale(self.spaceship_img, (self.spaceship_width, self.spaceship_height))
-
-        self.asteroid_img = pygame.image.load("asteroid.png")
-        self.powerup_gem_img = pygame.image.load("gem.png")
-        self.powerup_power_img = pygame.image.load("power.png")
-        self.powerup_weapon_img = pygame.image.load("weapon.png")
-        self.shield_img = pygame.image.load("shield.png")
-
-        # Set up the spaceship
-        self.spaceship_x = self.screen_width // 2 - self.spaceship_width // 2
-        self.spaceship_y = self.screen_height - self.spaceship_height - 10
-        self.spaceship_speed = 5
-
-        # Set up asteroids
-        self.n_asteroids = 0
-        self.asteroids = []
-        self.asteroid_speed = 2
-        self.asteroid_spawn_delay = 60  # Increase this value to decrease the frequency of asteroid spawns
-        self.max_asteroid_size = min(self.screen_width, self.screen_height) // 3  # Maximum asteroid size is 30% of the screen size
-
-        # bullet sound
-        # bullet_sound = pygame.mixer.Sound("bullet_sound.wav")
-        self.bullets = []
-
-        # Set up power-ups
-        self.powerups = []
-        self.powerup_spawn_delay = 600  # Increase this value to decrease the frequency of power-up spawns
-        self.max_powerup_size = min(self.screen_width, self.screen_height) // 2  # Maximum power-up size is 50% of the screen size
-
-        # Define initial power and power increment
-        self.power = 100
-        self.power_increment = 50
-
-        # Set up shields
-        self.shielded = False
-        self.shield_duration = 5 * 60  # 5 seconds at 60 FPS
-        self.shield_time = 0
-
-        # Set up weapons
-        self.weapons = []
-        self.weapon_levels = {
-            1: {"image": pygame.image.load("weapon_level1.png"), "damage": 3, "timer": 5 * 60},  # 5 seconds at 60 FPS
-            2: {"image": pygame.image.load("weapon_level2.png"), "damage": 2, "timer": 5 * 60},
-            3: {"image": pygame.image.load("weapon_level3.png"), "damage": 1, "timer": 10 * 60}  # 10 seconds at 60 FPS
-        }
-        self.current_weapon_level = 0
-        self.weapon_timer = 0
-
-        # Game variables
-        self.score = 0
-        self.score_timer = 0
-        self.game_over = False
-        self.game_running = False
-
-        self.clock = pygame.time.Clock()
-
-        # Load weapon images
-        self.weapon_level1_img = pygame.image.load("weapon_level1.png")
-        self.weapon_level2_img = pygame.image.load("weapon_level2.png")
-        self.weapon_level3_img = pygame.image.load("weapon_level3.png")
-
-        self.weapon_width = 50  # Set the desired width of the weapon images
-        self.weapon_height = 50  # Set the desired height of the weapon images
-        # Scale weapon images
-        self.weapon_level1_img = pygame.transform.scale(self.weapon_level1_img, (self.weapon_width, self.weapon_height))
-        self.weapon_level2_img = pygame.transform.scale(self.weapon_level2_img, (self.weapon_width, self.weapon_height))
-        self.weapon_level3_img = pygame.transform.scale(self.weapon_level3_img, (self.weapon_width, self.weapon_height))
-
-        # Create a list of weapon images
-        self.weapon_imgs = [self.weapon_level1_img, self.weapon_level2_img, self.weapon_level3_img]
-
-
-class GameStateManager:
-    def save_game_state(self, file_path):
-        state = {
-            "asteroids": self.n_asteroids,
-            "powerups": self.powerups,
-            "weapons": self.weapons,
-            "score": self.score,
-            "current_weapon_level": self.current_weapon_level
-        }
-        with open(file_path, "w") as file:
-            json.dump(state, file)
-
-    def load_game_state(self, file_path):
-        try:
-            with open(file_path, "r") as file:
-                state = json.load(file)
-            self.asteroids = state["asteroids"]
-            self.powerups = state["powerups"]
-            self.weapons = state["weapons"]
-            self.score = state["score"]
-            self.current_weapon_level = state["current_weapon_level"]
-        except FileNotFoundError:
-            # Handle the case when the file doesn't exist or cannot be loaded
-            print("Game state file not found. Starting a new game.")
-
-
-class Game(GameInitializer, GameStateManager):
-    def __init__(self):
-        super().__init__(800, 600)
-
-    def start_game(self):
-        self.power = 100
-        self.game_running = True
-        self.score = 0
-        self.score_timer = 0
-        self.game_over = False
-        self.current_weapon_level = 0
-        self.asteroids.clear()
-        self.powerups.clear()
-        self.weapons.clear()
-
-        self.game_loop()
-
-    def draw_power_meter(self):
-        power_meter_width = 200
-        power_meter_height = 20
-        power_meter_x = self.screen_width // 2 - power_meter_width // 2
-        power_meter_y = 10
-
-        # Calculate the width of the power meter fill based on the current power value
-        power_fill_width = int((self.power / 100) * power_meter_width)
-
-        # Draw the power meter outline
-        pygame.draw.rect(self.screen, self.WHITE, (power_meter_x, power_meter_y, power_meter_width, power_meter_height),
-                         2)
-
-        # Draw the power meter fill
-        pygame.draw.rect(self.screen, self.GREEN, (power_meter_x, power_meter_y, power_fill_width, power_meter_height))
-
-    def game_loop(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        if self.game_running:
-                            self.start_game()
-                        else:
-                            self.start_game()
-                    if event.key == pygame.K_SPACE:
-                        if self.current_weapon_level > 0:
-                            self.bullet_x = self.spaceship_x + self.spaceship_width // 2
-                            self.bullet_y = self.spaceship_y
-                            self.bullet_width = 5
-                            self.bullet_height = 10
-                            self.bullets.append([self.bullet_x, self.bullet_y, self.bullet_width, self.bullet_height])
-                            # bullet_sound.play()
-
-            if not self.game_running:
-                self.screen.fill(self.BLACK)
-                self.font = pygame.font.Font(None, 36)
-                self.text = self.font.render("Press Enter to Start", True, self.WHITE)
-                self.text_rect = self.text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
-                self.screen.blit(self.text, self.text_rect)
-                pygame.display.flip()
-                continue
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.game_running = False
-
-            self.keys = pygame.key.get_pressed()
-            if self.keys[pygame.K_LEFT]:
-                self.spaceship_x -= self.spaceship_speed
-            if self.keys[pygame.K_RIGHT]:
-                self.spaceship_x += self.spaceship_speed
-
-            # Update the spaceship position
-            if self.spaceship_x < 0:
-                self.spaceship_x = 0
-            elif self.spaceship_x > self.screen_width - self.spaceship_width:
-                self.spaceship_x = self.screen_width - self.spaceship_width
-
-            # Spawn asteroids
-            if random.randint(0, self.asteroid_spawn_delay) == 0:
-                self.asteroid_width = random.randint(10, self.max_asteroid_size)
-                self.asteroid_height = self.asteroid_width
-                self.asteroid_x = random.randint(0, self.screen_width - self.asteroid_width)
-                self.asteroid_y = random.randint(-self.screen_height, -self.asteroid_height)
-                self.asteroids.append([self.asteroid_x, self.asteroid_y, self.asteroid_width, self.asteroid_height])
-
-            # Spawn power-ups
-            if random.randint(0, self.powerup_spawn_delay) == 0:
-                self.powerup_type = random.choice(["gem", "power", "weapon"])
-                self.powerup_width = random.randint(10, self.max_powerup_size)
-                self.powerup_height = self.powerup_width
-                self.powerup_x = random.randint(0, self.screen_width - self.powerup_width)
-                self.powerup_y = random.randint(-self.screen_height, -self.powerup_height)
-                self.powerups.append(
-                    [self.powerup_x, self.powerup_y, self.powerup_width, self.powerup_height, self.powerup_type])
-
-            # Move and remove asteroids
-            for asteroid in self.asteroids:
-                asteroid[1] += self.asteroid_speed
-                if asteroid[1] > self.screen_height:
-                    self.asteroids.remove(asteroid)
-                    self.score += 1
-                    self.n_asteroids += 1
-
-            # Move and remove weapons
-            for weapon in self.weapons:
-                weapon[1] -= self.asteroid_speed - 1
-                if weapon[1] < -weapon[3]:
-                    self.weapons.remove(weapon)
-
-            # Check for collision between bullets and asteroids
-            for bullet in self.bullets:
-                bullet_rect = pygame.Rect(bullet[0], bullet[1], bullet[2], bullet[3])
-                for asteroid in self.asteroids:
-                    asteroid_rect = pygame.Rect(asteroid[0], asteroid[1], asteroid[2], asteroid[3])
-                    if bullet_rect.colliderect(asteroid_rect):
-                        self.bullets.remove(bullet)
-                        self.asteroids.remove(asteroid)
-                        self.score += 10
-
-            # Check for collision with asteroids
-            for asteroid in self.asteroids:
-                asteroid_rect = pygame.Rect(asteroid[0], asteroid[1], asteroid[2], asteroid[3])
-                spaceship_rect = pygame.Rect(self.spaceship_x, self.spaceship_y, self.spaceship_width,
-                                             self.spaceship_height)
-                if spaceship_rect.colliderect(asteroid_rect):
-                    if self.shielded:
-                        self.asteroids.remove(asteroid)
-                        self.score += 10
-                        self.n_asteroids += 1
-                    else:
-                        self.power -= 50  # Decrease power by 100 for each asteroid collision
-                        if self.power <= 0:
-                            self.game_over = True
-                            break
-
-                # Check for collision with weapons
-                for weapon in self.weapons:
-                    weapon_rect = pygame.Rect(weapon[0], weapon[1], weapon[2], weapon[3])
-                    if weapon_rect.colliderect(asteroid_rect):
-                        self.weapons.remove(weapon)
-                        asteroid[4] -= self.weapon_levels[self.current_weapon_level]["damage"]
-                        if asteroid[4] <= 0:
-                            self.asteroids.remove(asteroid)
-                            self.score += 10
-
-            # move and remove bullets
-            for bullet in self.bullets:
-                bullet[1] -= 5  # Adjust the bullet speed as needed
-                if bullet[1] < -bullet[3]:
-                    self.bullets.remove(bullet)
-
-            # Move power-ups
-            for powerup in self.powerups:
-                powerup[1] += self.asteroid_speed
-
-            # Check for collision with power-ups
-            for powerup in self.powerups:
-                powerup_rect = pygame.Rect(powerup[0], powerup[1], powerup[2], powerup[3])
-                if (
-                        self.spaceship_x < powerup[0] + powerup[2]
-                        and self.spaceship_x + self.spaceship_width > powerup[0]
-                        and self.spaceship_y < powerup[1] + powerup[3]
-                        and self.spaceship_y + self.spaceship_height > powerup[1]
-                ):
-                    self.powerups.remove(powerup)
-                    if powerup[4] == "gem":
-                        self.score += 10
-                        self.power += self.power_increment  # Increase power by power_increment when collecting a gem power-up
-                    elif powerup[4] == "power":
-                        self.shielded = True
-                        self.shield_time = self.shield_duration
-                    elif powerup[4] == "weapon":
-                        if self.current_weapon_level == 0:
-                            self.current_weapon_level = 1
-                            self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
-                        else:
-                            self.current_weapon_level = (self.current_weapon_level + 1) % len(self.weapon_levels)
-
-                        if self.current_weapon_level > 3:
-                            self.current_weapon_level = 1
-                            self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
-                        else:
-                            self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
-
-            # Update weapon timer
-            if self.weapon_timer > 0:
-                self.weapon_timer -= 1
-
-            # Check if weapon timer has expired
-            if self.weapon_timer == 0:
-                self.current_weapon_level = 0
-
-            # draw bullets on screen
-            for bullet in self.bullets:
-                bullet_rect = pygame.Rect(bullet[0], bullet[1], bullet[2], bullet[3])
-                pygame.draw.rect(self.screen, self.BLUE, bullet_rect)
-
-            # Draw current weapon
-            if self.current_weapon_level != 0:
-                weapon_image = self.weapon_levels[self.current_weapon_level]["image"]
-                weapon_rect = weapon_image.get_rect()
-                weapon_rect.centerx = spaceship_rect.centerx
-                weapon_rect.y = spaceship_rect.y
-                self.screen.blit(weapon_image, weapon_rect)
-
-            if self.current_weapon_level == 3 and len(self.asteroids) == 0:
-                self.level = 1
-                self.current_weapon_level = 3
-                self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
-                self.asteroid_speed = 2
-            # Draw on the screen
-            self.screen.fill(self.BLACK)
-            if self.shielded:
-                self.screen.blit(self.shield_img, (self.spaceship_x - 10, self.spaceship_y - 10))
-                shield_time_text = self.font.render(f"Shield Time: {int(self.shield_time / 60)}s", True, self.WHITE)
-                self.screen.blit(shield_time_text, (10, 50))
-            self.screen.blit(self.spaceship_img, (self.spaceship_x, self.spaceship_y))
-            for asteroid in self.asteroids:
-                asteroid_rect = pygame.Rect(asteroid[0], asteroid[1], asteroid[2], asteroid[3])
-                asteroid_img_resized = pygame.transform.scale(self.asteroid_img, (asteroid[2], asteroid[3]))
-                self.screen.blit(asteroid_img_resized, asteroid_rect)
-            for powerup in self.powerups:
-                powerup_rect = pygame.Rect(powerup[0], powerup[1], powerup[2], powerup[3])
-                if powerup[4] == "gem":
-                    powerup_img_resized = pygame.transform.scale(self.powerup_gem_img, (powerup[2], powerup[3]))
-                elif powerup[4] == "power":
-                    powerup_img_resized = pygame.transform.scale(self.powerup_power_img, (powerup[2], powerup[3]))
-                elif powerup[4] == "weapon":
-                    powerup_img_resized = pygame.transform.scale(self.powerup_weapon_img, (powerup[2], powerup[3]))
-                self.screen.blit(powerup_img_resized, powerup_rect)
-
-            # Draw the spaceship
-            self.screen.blit(self.spaceship_img, (self.spaceship_x, self.spaceship_y))
-
-            for bullet in self.bullets:
-                bullet_rect = pygame.Rect(bullet[0], bullet[1], bullet[2], bullet[3])
-                pygame.draw.rect(self.screen, self.BLUE, bullet_rect)
-
-            weapon_offset = self.spaceship_width  # Offset to position the collected weapons
-            if self.current_weapon_level > 0:
-                for weapon_level in range(self.current_weapon_level):
-                    weapon_img = self.weapon_imgs[weapon_level]
-                    weapon_width, weapon_height = weapon_img.get_size()
-                    self.screen.blit(weapon_img, (self.spaceship_x + weapon_offset, self.spaceship_y))
-                    weapon_offset += weapon_width
-
-            # Draw weapons
-            for weapon in self.weapons:
-                weapon_rect = pygame.Rect(weapon[0], weapon[1], weapon[2], weapon[3])
-                pygame.draw.rect(self.screen, self.RED, weapon_rect)
-
-            # Display current weapon level and timer
-            if self.current_weapon_level != 0:
-                weapon_level_text = self.font.render("Weapon Level: " + str(self.current_weapon_level), True,
-                                                     self.WHITE)
-                self.screen.blit(weapon_level_text, (600, 10))
-                if self.current_weapon_level != 0:
-                    weapon_timer_text = self.font.render("Weapon Timer: " + str(self.weapon_timer // 60) + "s", True,
-                                                         self.WHITE)
-                    self.screen.blit(weapon_timer_text, (600, 50))
-
-            # Update shield timer
-            if self.shielded:
-                self.shield_time -= 1
-                if self.shield_time <= 0:
-                    self.shielded = False
-
-            # Display score
-            self.font = pygame.font.Font(None, 36)
-            score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
-            self.screen.blit(score_text, (10, 10))
-
-            # Render power meter
-            self.draw_power_meter()
-
-            pygame.display.update()
-            self.clock.tick(60)  # Set the frame rate to 60
-
-            # Game over logic
-            if self.game_over:
-                self.game_running = False
-                self.screen.fill(self.BLACK)
-                self.font = pygame.font.Font(None, 36)
-                text = self.font.render(f"Game Over - Score: {self.score}", True, self.WHITE)
-                text_rect = text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
-                self.screen.blit(text, text_rect)
-                pygame.display.flip()
-                pygame.time.wait(2000)  # Wait for 2 seconds before restarting the game
-                self.save_game_state("game_state.json")
-
-
-class SaveableGame(Game):
-    def save_game_state(self, file_path):
-        state = {
-            "asteroids": self.n_asteroids,
-            "powerups": self.powerups,
-            "weapons": self.weapons,
-            "score": self.score,
-            "current_weapon_level": self.current_weapon_level
-        }
-        with open(file_path, "w") as file:
-            json.dump(state, file)
-
-    def load_game_state(self, file_path):
-        try:
-            with open(file_path, "r") as file:
-                state = json.load(file)
-            self.asteroids = state["asteroids"]
-            self.powerups = state["powerups"]
-            self.weapons = state["weapons"]
-            self.score = state["score"]
-            self.current_weapon_level = state["current_weapon_level"]
-        except FileNotFoundError:
-            # Handle the case when the file doesn't exist or cannot be loaded
-            print("Game state file not found. Starting a new game.")
-
-
-if __name__ == "__main__":
-    game = SaveableGame()
-    game.start_game()
-    game.start_again()
+import argparse
+import csv
+import gc
+import json
+import math
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+# Keep stdout clean for the JSON reports printed by the command line modes
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame  # noqa: E402
+
+# Power-up kinds, stored in EntityStore.kind as an index into this list
+POWERUP_TYPES = ["gem", "power", "weapon"]
+POWERUP_IMAGES = ["gem.png", "power.png", "weapon.png"]
+
+# Scenes of the main loop
+SCENE_TITLE = "title"
+SCENE_PLAYING = "playing"
+SCENE_GAME_OVER = "game_over"
+
+# Per-frame player input: held arrow keys plus SPACE/ENTER presses this frame
+FrameInput = namedtuple("FrameInput", ["left", "right", "fire", "start"])
+
+
+def random_policy(game):
+    # Stand-in player for headless runs: wander and fire at random
+    return FrameInput(random.random() < 0.3, random.random() < 0.3, random.random() < 0.05, False)
+
+
+class SpriteCache:
+    # Holds converted, pre-scaled copies of source images keyed by (image, width, height)
+    def __init__(self, max_entries=256, buckets=None, min_size=10, max_size=None):
+        self.max_entries = max_entries
+        self.buckets = buckets
+        self.min_size = min_size
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+        self._sources = {}
+        self._bucketed = {}  # (buckets, size) -> bucketed size
+
+    def bucket_size(self, size):
+        # Round a size to the nearest of a fixed number of geometrically spaced buckets,
+        # so every size is off by at most the same fraction, small sizes included
+        if not self.buckets or self.max_size is None or self.max_size <= self.min_size:
+            return size
+        key = (self.buckets, size)
+        bucketed = self._bucketed.get(key)
+        if bucketed is None:
+            step = math.log(self.max_size / self.min_size) / self.buckets
+            index = min(self.buckets, max(0, round(math.log(max(size, self.min_size) / self.min_size) / step)))
+            bucketed = self._bucketed[key] = round(self.min_size * math.exp(index * step))
+        return bucketed
+
+    def get(self, image, width, height):
+        width = self.bucket_size(width)
+        height = self.bucket_size(height)
+        key = (image, width, height)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        source = self._sources.get(image)
+        if source is None:
+            # Convert each source image to the display format only once
+            if image.get_flags() & pygame.SRCALPHA:
+                source = self._sources[image] = image
+            else:
+                source = self._sources[image] = image.convert_alpha()
+        surface = pygame.transform.smoothscale(source, (width, height))
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)  # Evict the least recently used size
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._sources.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+class HudText:
+    # Loads each font size once and caches rendered labels keyed by (text, color, size).
+    # Numbers are blitted glyph by glyph from a pre-rendered digit atlas, so a changing
+    # score never renders or allocates a new surface.
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._fonts = {}
+        self._labels = OrderedDict()
+        self._atlases = {}
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def label(self, text, color, size=36):
+        key = (text, color, size)
+        surface = self._labels.get(key)
+        if surface is None:
+            surface = self._labels[key] = self.font(size).render(text, True, color)
+            if len(self._labels) > self.max_entries:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(key)
+        return surface
+
+    def digit_atlas(self, color, size=36):
+        # One surface holding "0123456789" plus the source rect of each glyph
+        key = (color, size)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            font = self.font(size)
+            surface = font.render("0123456789", True, color)
+            height = surface.get_height()
+            glyphs = []
+            for digit in range(10):
+                left = font.size("0123456789"[:digit])[0]
+                right = font.size("0123456789"[:digit + 1])[0]
+                glyphs.append(pygame.Rect(left, 0, right - left, height))
+            atlas = self._atlases[key] = (surface, glyphs)
+        return atlas
+
+    def draw_number(self, surface, value, x, y, color, size=36):
+        # Blit a non-negative integer from the digit atlas; returns the x after it
+        atlas, glyphs = self.digit_atlas(color, size)
+        for char in str(max(0, int(value))):
+            glyph = glyphs[ord(char) - 48]
+            surface.blit(atlas, (x, y), glyph)
+            x += glyph.width
+        return x
+
+    def draw_field(self, surface, prefix, value, suffix, pos, color, size=36):
+        # Draw "<prefix><value><suffix>"; returns the area it covered
+        x, y = pos
+        prefix_surface = self.label(prefix, color, size)
+        surface.blit(prefix_surface, (x, y))
+        end = self.draw_number(surface, value, x + prefix_surface.get_width(), y, color, size)
+        if suffix:
+            suffix_surface = self.label(suffix, color, size)
+            surface.blit(suffix_surface, (end, y))
+            end += suffix_surface.get_width()
+        return pygame.Rect(x, y, end - x, prefix_surface.get_height())
+
+
+class Sprite:
+    # One pooled draw command. The Rects are allocated once and updated in place every
+    # time the sprite is reused: dest is where the source goes, rect is the part of it
+    # that is on screen.
+    __slots__ = ("source", "dest", "rect")
+
+    def __init__(self):
+        self.source = None
+        self.dest = pygame.Rect(0, 0, 0, 0)
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+
+class ScaledDisplay:
+    # Owns the window. The game draws into surface at a fixed logical resolution and
+    # SDL scales each presented frame up to the physical display on the GPU
+    # (pygame.SCALED), so drawing cost does not grow with the display size. In a
+    # SCALED window the display surface already is that logical-resolution buffer.
+    # Fullscreen integer scaling instead makes the window the desktop size divided by
+    # the largest whole-number scale that fits; the game is then drawn into its own
+    # offscreen surface and copied to the middle of the window, with black bars.
+    # A SCALED window always uploads and presents the whole frame, whatever areas are
+    # passed to update(), so dirty rects there only save drawing, not upload bandwidth.
+    # scaled=False opens a plain window at the logical resolution instead, where update()
+    # copies just the given areas to the screen; it cannot sync to the display refresh.
+    def __init__(self, width, height, fullscreen=False, integer_scale=False, vsync=True, headless=False,
+                 scaled=True):
+        size = (width, height)
+        flags = 0
+        self.scaled = scaled and not headless  # The dummy video driver has no renderer to scale with
+        if not headless:
+            if self.scaled:
+                flags = pygame.SCALED
+            if fullscreen:
+                flags |= pygame.FULLSCREEN
+                if integer_scale and self.scaled:
+                    desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+                    scale = max(1, min(desktop_width // width, desktop_height // height))
+                    size = (desktop_width // scale, desktop_height // scale)
+        self.vsync = vsync and self.scaled
+        try:
+            self.window = pygame.display.set_mode(size, flags, vsync=int(self.vsync))
+        except pygame.error:
+            # Not every driver can sync to the display's refresh
+            self.vsync = False
+            self.window = pygame.display.set_mode(size, flags)
+        if size == (width, height):
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface((width, height), 0, self.window)
+        self.offset = ((size[0] - width) // 2, (size[1] - height) // 2)
+
+    def update(self, rects):
+        # Present the given areas of surface, in logical coordinates
+        if self.surface is self.window:
+            pygame.display.update(rects)
+            return
+        window_rects = [rect.move(self.offset) for rect in rects]
+        for rect, window_rect in zip(rects, window_rects):
+            self.window.blit(self.surface, window_rect, rect)
+        pygame.display.update(window_rects)
+
+    def flip(self):
+        if self.surface is not self.window:
+            self.window.blit(self.surface, self.offset)
+        pygame.display.flip()
+
+
+class LayeredRenderer:
+    # Draws a frame as three layers: a static pre-converted background, the sprites and
+    # the HUD. Only the areas that changed since the last frame are presented through
+    # display (a ScaledDisplay, or pygame.display itself). Sprites come from two pools
+    # that swap every frame, so this frame's and last frame's rects are always at hand
+    # without new allocations.
+    def __init__(self, screen, background, display=pygame.display):
+        self.screen = screen
+        self.background = background
+        self.display = display
+        self._sprites = []
+        self._count = 0
+        self._last_sprites = []
+        self._last_count = 0
+        self._hud = []
+        self._hud_drawn = {}
+        self._full_redraw = True
+        self.update_started = None  # When the last present() handed its frame to the display
+
+    def invalidate(self):
+        # Repaint and present the whole screen on the next frame, e.g. after a menu
+        self._full_redraw = True
+
+    def _acquire(self):
+        if self._count == len(self._sprites):
+            self._sprites.append(Sprite())
+        sprite = self._sprites[self._count]
+        self._count += 1
+        return sprite
+
+    def blit(self, surface, x, y):
+        sprite = self._acquire()
+        sprite.source = surface
+        sprite.dest.update(x, y, surface.get_width(), surface.get_height())
+
+    def fill(self, color, x, y, width, height):
+        sprite = self._acquire()
+        sprite.source = color
+        sprite.dest.update(x, y, width, height)
+
+    def hud(self, key, value, draw):
+        # draw() paints the element and returns its rect; it only runs when value
+        # changes or a sprite has touched the element's area
+        self._hud.append((key, value, draw))
+
+    def present(self):
+        screen = self.screen
+        background = self.background
+        clip = screen.get_rect()
+
+        # Clip to the screen up front: blitting or filling a partly off-screen area would
+        # shift it on screen
+        width, height = clip.size
+        sprites = self._sprites[:self._count]
+        sprite_rects = []
+        for sprite in sprites:
+            dest = sprite.dest
+            left = max(dest.left, 0)
+            top = max(dest.top, 0)
+            sprite.rect.update(left, top, max(0, min(dest.right, width) - left),
+                               max(0, min(dest.bottom, height) - top))
+            sprite_rects.append(sprite.rect)
+
+        live = {key for key, _, _ in self._hud}
+        if self._full_redraw:
+            erased = [clip]
+        else:
+            erased = [sprite.rect for sprite in self._last_sprites[:self._last_count]]
+            # HUD elements that disappeared leave their old area behind
+            for key, (_, rect) in self._hud_drawn.items():
+                if key not in live:
+                    erased.append(rect)
+
+        # A HUD element is redrawn from a clean background when its value changes or
+        # anything underneath it is erased or drawn this frame. Erasing an element's old
+        # area can in turn touch another element, so repeat until nothing new is touched.
+        redrawn = set()
+        unchanged = []
+        for key, value, _ in self._hud:
+            previous = self._hud_drawn.get(key)
+            if self._full_redraw or previous is None:
+                redrawn.add(key)
+            elif previous[0] != value:
+                erased.append(previous[1])
+                redrawn.add(key)
+            else:
+                unchanged.append((key, previous[1]))
+        while unchanged:
+            touched = erased + sprite_rects
+            hit = [(key, rect) for key, rect in unchanged if rect.collidelist(touched) != -1]
+            if not hit:
+                break
+            for key, rect in hit:
+                erased.append(rect)
+                redrawn.add(key)
+            unchanged = [(key, rect) for key, rect in unchanged if key not in redrawn]
+        # Redraw in submission order so overlapping elements stack as in a full redraw
+        redraw = [item for item in self._hud if item[0] in redrawn]
+
+        for rect in erased:
+            screen.blit(background, rect, rect)
+        for sprite in sprites:
+            if isinstance(sprite.source, pygame.Surface):
+                screen.blit(sprite.source, sprite.dest)
+            else:
+                screen.fill(sprite.source, sprite.rect)
+
+        hud_drawn = {key: drawn for key, drawn in self._hud_drawn.items() if key in live}
+        hud_rects = []
+        for key, value, draw in redraw:
+            rect = draw().clip(clip)
+            hud_rects.append(rect)
+            hud_drawn[key] = (value, rect)
+        self._hud_drawn = hud_drawn
+
+        dirty = erased + sprite_rects + hud_rects
+        self.update_started = time.perf_counter()
+        self.display.update(dirty)
+
+        self._sprites, self._last_sprites = self._last_sprites, self._sprites
+        self._last_count = self._count
+        self._count = 0
+        self._hud = []
+        self._full_redraw = False
+
+
+class FrameProfiler:
+    # Opt-in per-phase frame timings kept in a fixed-size ring buffer. While disabled,
+    # mark() returns after a single attribute check. Only frames that began while
+    # enabled are recorded, so turning profiling on mid-frame (F3) never records a
+    # frame with no start time.
+    PHASES = ["events", "spawn", "move", "collide", "timers", "draw", "present", "tick"]
+
+    def __init__(self, capacity=600, budget_ms=1000 / 60, spike_ms=25.0, max_spikes=256):
+        self.enabled = False
+        self.show_overlay = False
+        self.budget_ms = budget_ms
+        self.spike_ms = spike_ms
+        self.frames = 0
+        self._index = {phase: i for i, phase in enumerate(self.PHASES)}
+        # One row per frame: phase times followed by the whole frame time, in milliseconds
+        self._samples = np.zeros((capacity, len(self.PHASES) + 1))
+        self._row = [0.0] * len(self.PHASES)
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._in_frame = False
+        self.spikes = deque(maxlen=max_spikes)
+        self._overlay = None
+
+    def begin_frame(self):
+        self._in_frame = self.enabled
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._row = [0.0] * len(self.PHASES)
+
+    def mark(self, phase):
+        # Charge the time since the previous mark to phase
+        if not self._in_frame:
+            return
+        now = time.perf_counter()
+        self._row[self._index[phase]] += (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        total = (time.perf_counter() - self._frame_start) * 1000
+        sample = self._samples[self.frames % len(self._samples)]
+        sample[:-1] = self._row
+        sample[-1] = total
+        if total > self.spike_ms:
+            spike = {"frame": self.frames, "total_ms": total}
+            spike.update(zip(self.PHASES, self._row))
+            self.spikes.append(spike)
+        self.frames += 1
+
+    def recent(self):
+        # Samples currently in the ring buffer, oldest first
+        count = min(self.frames, len(self._samples))
+        if self.frames <= len(self._samples):
+            return self._samples[:count]
+        start = self.frames % len(self._samples)
+        return np.concatenate((self._samples[start:], self._samples[:start]))
+
+    def percentiles(self):
+        samples = self.recent()
+        stats = {}
+        for i, phase in enumerate(self.PHASES + ["frame"]):
+            column = samples[:, i] if len(samples) else np.zeros(1)
+            stats[phase] = {
+                "mean": float(np.mean(column)),
+                "p50": float(np.percentile(column, 50)),
+                "p95": float(np.percentile(column, 95)),
+                "p99": float(np.percentile(column, 99))
+            }
+        return stats
+
+    def export(self, path, extra=None):
+        # JSON gets percentiles and spikes together; CSV writes the spikes next to it.
+        # extra maps a name to a dict of counters reported alongside, e.g. cache stats;
+        # CSV writes each one to its own name/value file.
+        stats = self.percentiles()
+        extra = extra or {}
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["phase", "mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+                for phase, values in stats.items():
+                    writer.writerow([phase, values["mean"], values["p50"], values["p95"], values["p99"]])
+            with open(path[:-4] + "_spikes.csv", "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["frame", "total_ms"] + self.PHASES)
+                for spike in self.spikes:
+                    writer.writerow([spike["frame"], spike["total_ms"]] + [spike[phase] for phase in self.PHASES])
+            for name, counters in extra.items():
+                with open(path[:-4] + "_" + name + ".csv", "w", newline="") as file:
+                    writer = csv.writer(file)
+                    writer.writerow(["name", "value"])
+                    writer.writerows(counters.items())
+        else:
+            report = {"frames": self.frames, "window": len(self.recent()), "phases": stats,
+                      "spikes": list(self.spikes)}
+            report.update(extra)
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enabled = True
+
+    def render_overlay(self, hud, color=(255, 255, 255)):
+        # Frame-time graph over the last frames plus the mean of each phase in microseconds
+        if self._overlay is None:
+            self._overlay = pygame.Surface((240, 230)).convert()
+        overlay = self._overlay
+        overlay.fill((20, 20, 20))
+        graph_height = 60
+        scale = graph_height / (self.budget_ms * 2)
+        samples = self.recent()[-overlay.get_width():]
+        for x, total in enumerate(samples[:, -1].tolist()):
+            bar = min(graph_height, int(total * scale))
+            bar_color = (255, 80, 80) if total > self.budget_ms else (80, 255, 80)
+            pygame.draw.line(overlay, bar_color, (x, graph_height), (x, graph_height - bar))
+        budget_y = graph_height - int(self.budget_ms * scale)
+        pygame.draw.line(overlay, (255, 255, 0), (0, budget_y), (overlay.get_width(), budget_y))
+
+        means = samples.mean(axis=0) if len(samples) else np.zeros(len(self.PHASES) + 1)
+        for i, phase in enumerate(self.PHASES + ["frame"]):
+            hud.draw_field(overlay, phase + ": ", int(means[i] * 1000), " us",
+                           (6, graph_height + 6 + i * 18), color, 22)
+        return overlay
+
+
+class FrameGovernor:
+    # Keeps frames inside a time budget. It averages how long recent frames took to
+    # update and draw (not counting the display update, which may wait for vsync, or the
+    # frame cap's sleep) and steps a throttle level up while they run over budget, then
+    # back down once there is headroom again.
+    # Level 0 is full quality; each level caps live asteroids lower, spaces spawns
+    # further apart and draws cheaper. Every change is logged in decisions.
+    LEVELS = [
+        {"max_asteroids": None, "spawn_gap": 0, "sprite_detail": 1.0, "decorations": True},
+        {"max_asteroids": 150, "spawn_gap": 10, "sprite_detail": 0.75, "decorations": True},
+        {"max_asteroids": 80, "spawn_gap": 30, "sprite_detail": 0.6, "decorations": False},
+        {"max_asteroids": 40, "spawn_gap": 60, "sprite_detail": 0.5, "decorations": False}
+    ]
+
+    def __init__(self, budget_ms=1000 / 60, window=30, headroom=0.6, recover_frames=180, max_decisions=256):
+        self.enabled = True
+        self.budget_ms = budget_ms
+        self.headroom = headroom  # Step down once frames average under this fraction of the budget
+        self.recover_frames = recover_frames  # Minimum frames at a level before stepping down
+        self.level = 0
+        self.frames = 0
+        self._times = deque(maxlen=window)
+        self._since_change = 0
+        self.decisions = deque(maxlen=max_decisions)
+
+    @property
+    def settings(self):
+        return self.LEVELS[self.level]
+
+    def record(self, frame_ms):
+        # Call once per played frame; returns True when the level changed
+        self.frames += 1
+        if not self.enabled:
+            return False
+        self._times.append(frame_ms)
+        self._since_change += 1
+        if len(self._times) < self._times.maxlen:
+            return False
+        mean = sum(self._times) / len(self._times)
+        if mean > self.budget_ms and self.level < len(self.LEVELS) - 1:
+            self._change(self.level + 1, mean, "over budget")
+        elif mean < self.budget_ms * self.headroom and self.level > 0 and self._since_change >= self.recover_frames:
+            self._change(self.level - 1, mean, "headroom")
+        else:
+            return False
+        return True
+
+    def _change(self, level, mean, reason):
+        self.decisions.append({"frame": self.frames, "from": self.level, "to": level, "mean_ms": mean,
+                               "reason": reason})
+        self.level = level
+        self._times.clear()  # Judge the new level on its own frames
+        self._since_change = 0
+
+    def report(self):
+        return {
+            "enabled": self.enabled,
+            "budget_ms": self.budget_ms,
+            "level": self.level,
+            "settings": self.settings,
+            "frames": self.frames,
+            "decisions": list(self.decisions)
+        }
+
+
+class EntityStore:
+    # Structure-of-arrays storage for one kind of entity. Rows [0, count) are live;
+    # the backing arrays double in size whenever they fill up. _px and _py hold each
+    # row's position at the start of the current tick, for interpolated drawing.
+    COLUMNS = ("_x", "_y", "_w", "_h", "_kind", "_hp", "_px", "_py")
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self._x = np.zeros(capacity, dtype=np.float64)
+        self._y = np.zeros(capacity, dtype=np.float64)
+        self._w = np.zeros(capacity, dtype=np.int32)
+        self._h = np.zeros(capacity, dtype=np.int32)
+        self._kind = np.zeros(capacity, dtype=np.int32)
+        self._hp = np.zeros(capacity, dtype=np.int32)
+        self._px = np.zeros(capacity, dtype=np.float64)
+        self._py = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.count
+
+    # Views of the live rows; writes through them update the store
+    @property
+    def x(self):
+        return self._x[:self.count]
+
+    @property
+    def y(self):
+        return self._y[:self.count]
+
+    @property
+    def w(self):
+        return self._w[:self.count]
+
+    @property
+    def h(self):
+        return self._h[:self.count]
+
+    @property
+    def kind(self):
+        return self._kind[:self.count]
+
+    @property
+    def hp(self):
+        return self._hp[:self.count]
+
+    @property
+    def capacity(self):
+        return len(self._x)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, w, h, kind=0, hp=0):
+        if self.count == self.capacity:
+            self._grow()
+        index = self.count
+        self._x[index] = x
+        self._y[index] = y
+        self._w[index] = w
+        self._h[index] = h
+        self._kind[index] = kind
+        self._hp[index] = hp
+        self._px[index] = x  # New rows are drawn where they spawn, not swept in
+        self._py[index] = y
+        self.count += 1
+        return index
+
+    def clear(self):
+        self.count = 0
+
+    def remove(self, mask):
+        # Drop every row where mask is True, keeping the survivors in order
+        keep = ~mask
+        survivors = int(np.count_nonzero(keep))
+        if survivors == self.count:
+            return 0
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:survivors] = column[:self.count][keep]
+        removed = self.count - survivors
+        self.count = survivors
+        return removed
+
+    def remove_indices(self, indices):
+        if len(indices) == 0:
+            return 0
+        mask = np.zeros(self.count, dtype=bool)
+        mask[indices] = True
+        return self.remove(mask)
+
+    def store_previous(self):
+        # Call at the start of each tick, before anything moves
+        self._px[:self.count] = self._x[:self.count]
+        self._py[:self.count] = self._y[:self.count]
+
+    def move(self, dx, dy):
+        if dx:
+            self.x[:] += dx
+        if dy:
+            self.y[:] += dy
+
+    def below(self, limit):
+        # Rows whose top edge has moved past limit
+        return self.y > limit
+
+    def above(self, limit):
+        # Rows whose bottom edge has moved above limit
+        return self.y + self.h < limit
+
+    def overlaps(self, x, y, w, h):
+        # Boolean mask of rows whose bounding box overlaps the given box
+        return (self.x < x + w) & (x < self.x + self.w) & (self.y < y + h) & (y < self.y + self.h)
+
+    def snapshot(self):
+        # Copies of the live columns, for save states and replay keyframes
+        return {name: getattr(self, name).copy() for name in ("x", "y", "w", "h", "kind", "hp")}
+
+    def restore(self, snapshot):
+        self.clear()
+        count = len(snapshot["x"])
+        while self.capacity < count:
+            self._grow()
+        self.count = count
+        for name, column in snapshot.items():
+            getattr(self, name)[:] = column
+        self.store_previous()
+
+    def rows(self, alpha=1.0):
+        # (x, y, w, h, kind, hp) tuples for the live rows, for drawing and saving.
+        # alpha < 1 places each row that far between its previous and current position.
+        x, y = self.x, self.y
+        if alpha < 1.0:
+            px, py = self._px[:self.count], self._py[:self.count]
+            x = px + (x - px) * alpha
+            y = py + (y - py) * alpha
+        return zip(x.tolist(), y.tolist(), self.w.tolist(), self.h.tolist(),
+                   self.kind.tolist(), self.hp.tolist())
+
+
+class CollisionWorld:
+    # Uniform spatial hash grid over EntityStores. Each entity is hashed into every
+    # cell its box touches; the (cell, index) entries are kept sorted by cell key so
+    # that lookups are a vectorized binary search instead of Python dict probes.
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._categories = {}
+
+    def _cells(self, store):
+        # Expand every entity into the (cell key, entity index) entries it occupies
+        size = self.cell_size
+        x0 = np.floor_divide(store.x, size).astype(np.int64)
+        y0 = np.floor_divide(store.y, size).astype(np.int64)
+        x1 = np.floor_divide(store.x + store.w - 1, size).astype(np.int64)
+        y1 = np.floor_divide(store.y + store.h - 1, size).astype(np.int64)
+        columns = x1 - x0 + 1
+        per_entity = columns * (y1 - y0 + 1)
+        index = np.repeat(np.arange(store.count), per_entity)
+        local = np.arange(len(index)) - np.repeat(np.cumsum(per_entity) - per_entity, per_entity)
+        cell_x = x0[index] + local % columns[index]
+        cell_y = y0[index] + local // columns[index]
+        # Pack both cell coordinates into one key; the offsets keep them non-negative
+        keys = (cell_x + (1 << 20)) << 21 | (cell_y + (1 << 20))
+        return keys, index
+
+    def rebuild(self, categories):
+        # categories maps a name to the EntityStore that can be queried against
+        self._categories = {}
+        for category, store in categories.items():
+            keys, index = self._cells(store)
+            order = np.argsort(keys, kind="stable")
+            self._categories[category] = (store, keys[order], index[order])
+
+    def candidates(self, store, category):
+        # (entity index, target index) pairs that share at least one grid cell
+        targets, target_keys, target_index = self._categories[category]
+        keys, index = self._cells(store)
+        start = np.searchsorted(target_keys, keys, side="left")
+        stop = np.searchsorted(target_keys, keys, side="right")
+        matches = stop - start
+        entity = np.repeat(index, matches)
+        offset = np.arange(len(entity)) - np.repeat(np.cumsum(matches) - matches, matches)
+        target = target_index[np.repeat(start, matches) + offset]
+        # Large boxes share several cells, so drop duplicate pairs
+        packed = np.unique(entity * max(1, targets.count) + target)
+        return packed // max(1, targets.count), packed % max(1, targets.count)
+
+    def overlapping(self, store, category):
+        # Candidate pairs whose bounding boxes actually overlap, tested as one batch
+        targets = self._categories[category][0]
+        entity, target = self.candidates(store, category)
+        hit = ((store.x[entity] < targets.x[target] + targets.w[target])
+               & (targets.x[target] < store.x[entity] + store.w[entity])
+               & (store.y[entity] < targets.y[target] + targets.h[target])
+               & (targets.y[target] < store.y[entity] + store.h[entity]))
+        return entity[hit], target[hit]
+
+    def overlapping_rect(self, rect, category):
+        # Indices in category overlapping a single rect, e.g. the spaceship
+        targets = self._categories[category][0]
+        return np.flatnonzero(targets.overlaps(rect.x, rect.y, rect.width, rect.height))
+
+
+class AssetManager:
+    # Loads each image file once and converts it to the display pixel format. Scaled
+    # variants are cached next to their source, nothing is read from disk until it is
+    # first asked for, and small sprites can be packed into a single atlas surface.
+    def __init__(self):
+        self._images = {}
+        self._stats = {}
+        self.atlas = None
+
+    def load(self, path, size=None):
+        key = (path, size)
+        surface = self._images.get(key)
+        if surface is not None:
+            return surface
+
+        started = time.perf_counter()
+        if size is None:
+            surface = pygame.image.load(path)
+            # Keep per-pixel alpha only for images that have it; opaque ones blit faster
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+        else:
+            surface = pygame.transform.smoothscale(self.load(path), size)
+        self._images[key] = surface
+        self._stats[key] = {
+            "path": path,
+            "size": list(surface.get_size()),
+            "load_ms": (time.perf_counter() - started) * 1000,
+            "bytes": surface.get_pitch() * surface.get_height()
+        }
+        return surface
+
+    def unload(self, path, size=None):
+        # Drop a cached image, e.g. a large source once its scaled variants exist
+        self._images.pop((path, size), None)
+        self._stats.pop((path, size), None)
+
+    def pack_atlas(self, keys, max_width=1024):
+        # Copy already loaded sprites into one surface with a simple shelf packer and
+        # replace each cached sprite with a subsurface of the atlas
+        sprites = sorted(keys, key=lambda key: self._images[key].get_height(), reverse=True)
+        positions = {}
+        x = y = shelf_height = width = 0
+        for key in sprites:
+            sprite_width, sprite_height = self._images[key].get_size()
+            if x + sprite_width > max_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            positions[key] = (x, y)
+            x += sprite_width
+            width = max(width, x)
+            shelf_height = max(shelf_height, sprite_height)
+
+        atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA).convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        for key, pos in positions.items():
+            # Adding onto transparent black copies the pixels and alpha unchanged
+            atlas.blit(self._images[key], pos, special_flags=pygame.BLEND_RGBA_ADD)
+            self._images[key] = atlas.subsurface(pygame.Rect(pos, self._images[key].get_size()))
+            self._stats[key]["bytes"] = 0  # Pixels now live in the atlas
+        self.atlas = atlas
+        self._stats[("<atlas>", None)] = {
+            "path": "<atlas>",
+            "size": [atlas.get_width(), atlas.get_height()],
+            "load_ms": 0.0,
+            "bytes": atlas.get_pitch() * atlas.get_height()
+        }
+        return atlas
+
+    def report(self):
+        # Load time and memory of every asset loaded so far
+        return sorted(self._stats.values(), key=lambda stat: stat["bytes"], reverse=True)
+
+
+class GameRandom(random.Random):
+    # The game's random generator. It counts the 32-bit words drawn since it was last
+    # seeded, so its state can be saved as just (seed, words) and rebuilt by seeding
+    # and drawing that many words again, instead of saving all 625 words of
+    # Mersenne Twister state. Integer draws (randint, randrange, choice) go through
+    # getrandbits and float draws (random, uniform) through random, which takes two
+    # words; gauss keeps a cached value outside the generator and must not be used.
+    def seed(self, a=None, version=2):
+        if a is None:
+            # Leave the global generator alone so a seeded run stays reproducible
+            a = int.from_bytes(os.urandom(8), "little")
+        else:
+            a = abs(a)  # Random seeds an integer by its absolute value anyway
+        super().seed(a, version)
+        self.seed_value = a
+        self.words = 0
+
+    def getrandbits(self, k):
+        self.words += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def random(self):
+        self.words += 2
+        return super().random()
+
+    def getstate(self):
+        return self.seed_value, self.words
+
+    def setstate(self, state):
+        seed, words = state
+        self.seed(seed)
+        if words:
+            self.getrandbits(32 * words)  # Draws exactly words words in one call
+
+
+class SnapshotCodec:
+    # Versioned binary encoding of Game.capture_state(). A snapshot is a header followed
+    # by sections: the scalar game fields, the random generator state and one section
+    # per column of each entity store. A delta snapshot only carries the sections that
+    # differ from the full snapshot it is based on, so columns that rarely change
+    # (sizes, kinds, hit points) and stores that are unchanged stay out of it. A changed
+    # column is stored as a patch of the rows that differ from the base column when
+    # that is smaller than the whole column.
+    MAGIC = b"SGSS"
+    VERSION = 3
+    HEADER = struct.Struct("<4sHHII")  # magic, version, flags, snapshot id, base id
+    DELTA = 1
+    SCALARS = [
+        ("game_seed", "Q"), ("spaceship_x", "d"), ("power", "q"), ("score", "q"), ("score_timer", "q"),
+        ("game_over", "?"), ("n_asteroids", "q"), ("asteroid_speed", "d"), ("current_weapon_level", "q"),
+        ("weapon_timer", "q"), ("shielded", "?"), ("shield_time", "q"), ("throttle_level", "q"),
+        ("deferred_spawns", "q"), ("spawn_cooldown", "q")
+    ]
+    SCALAR_STRUCT = struct.Struct("<" + "".join(code for _, code in SCALARS))
+    RNG_STRUCT = struct.Struct("<QQ")  # seed, words drawn
+    STORES = ["asteroids", "powerups", "bullets", "weapons"]
+    COLUMNS = [("x", "<f8"), ("y", "<f8"), ("w", "<i4"), ("h", "<i4"), ("kind", "<i4"), ("hp", "<i4")]
+    SECTION = struct.Struct("<BI")  # section id, payload length
+    PATCH = 0x80  # Added to a column's section id when its payload is a row patch
+    PATCH_HEADER = struct.Struct("<II")  # rows in the column, rows patched
+
+    @classmethod
+    def _column_section(cls, store_index, column_index):
+        return 2 + store_index * len(cls.COLUMNS) + column_index
+
+    @classmethod
+    def _sections(cls, state):
+        scalars = [state[name] for name, _ in cls.SCALARS]
+        yield 0, cls.SCALAR_STRUCT.pack(*scalars)
+        yield 1, cls.RNG_STRUCT.pack(*state["rng"])
+        for i, name in enumerate(cls.STORES):
+            store = state[name]
+            for j, (column, dtype) in enumerate(cls.COLUMNS):
+                yield cls._column_section(i, j), np.ascontiguousarray(store[column], dtype=dtype).tobytes()
+
+    @classmethod
+    def _column_dtype(cls, key):
+        return cls.COLUMNS[(key - 2) % len(cls.COLUMNS)][1]
+
+    @classmethod
+    def _patch(cls, key, payload, base_payload):
+        # Row patch turning base_payload into payload: row count, then the indices and
+        # values of the rows that differ or lie past the end of the base column
+        dtype = cls._column_dtype(key)
+        new = np.frombuffer(payload, dtype=dtype)
+        old = np.frombuffer(base_payload, dtype=dtype)
+        shared = min(len(new), len(old))
+        rows = np.concatenate([np.flatnonzero(new[:shared] != old[:shared]),
+                               np.arange(shared, len(new))]).astype("<u4")
+        return cls.PATCH_HEADER.pack(len(new), len(rows)) + rows.tobytes() + new[rows].tobytes()
+
+    @classmethod
+    def _apply_patch(cls, key, patch, base_payload):
+        dtype = cls._column_dtype(key)
+        count, patched = cls.PATCH_HEADER.unpack_from(patch)
+        offset = cls.PATCH_HEADER.size
+        rows = np.frombuffer(patch, dtype="<u4", count=patched, offset=offset)
+        values = np.frombuffer(patch, dtype=dtype, count=patched, offset=offset + rows.nbytes)
+        column = np.zeros(count, dtype=dtype)
+        old = np.frombuffer(base_payload, dtype=dtype)
+        shared = min(count, len(old))
+        column[:shared] = old[:shared]
+        column[rows] = values
+        return column.tobytes()
+
+    @classmethod
+    def encode(cls, state, snapshot_id, base=None, base_id=0):
+        # base is the section dict of a full snapshot; only changed sections are kept.
+        # The sections returned are the full ones, ready to be the base of later deltas.
+        sections = dict(cls._sections(state))
+        written = sections
+        flags = 0
+        if base is not None:
+            flags = cls.DELTA
+            written = {}
+            for key, payload in sections.items():
+                if base.get(key) == payload:
+                    continue
+                if key >= 2 and key in base:
+                    patch = cls._patch(key, payload, base[key])
+                    if len(patch) < len(payload):
+                        written[cls.PATCH + key] = patch
+                        continue
+                written[key] = payload
+        chunks = [cls.HEADER.pack(cls.MAGIC, cls.VERSION, flags, snapshot_id, base_id)]
+        for key, payload in written.items():
+            chunks.append(cls.SECTION.pack(key, len(payload)))
+            chunks.append(payload)
+        return b"".join(chunks), sections
+
+    @classmethod
+    def read(cls, data):
+        # Returns (flags, snapshot id, base id, {section id: payload})
+        magic, version, flags, snapshot_id, base_id = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("not a snapshot file")
+        if version != cls.VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        sections = {}
+        offset = cls.HEADER.size
+        while offset < len(data):
+            key, length = cls.SECTION.unpack_from(data, offset)
+            offset += cls.SECTION.size
+            sections[key] = data[offset:offset + length]
+            offset += length
+        return flags, snapshot_id, base_id, sections
+
+    @classmethod
+    def apply(cls, base, delta):
+        # The sections of a full snapshot with a delta's sections applied to them
+        sections = dict(base)
+        for key, payload in delta.items():
+            if key & cls.PATCH:
+                key -= cls.PATCH
+                payload = cls._apply_patch(key, payload, base[key])
+            sections[key] = payload
+        return sections
+
+    @classmethod
+    def decode(cls, sections):
+        state = dict(zip((name for name, _ in cls.SCALARS), cls.SCALAR_STRUCT.unpack(sections[0])))
+        state["rng"] = cls.RNG_STRUCT.unpack(sections[1])
+        for i, name in enumerate(cls.STORES):
+            state[name] = {column: np.frombuffer(sections[cls._column_section(i, j)], dtype=dtype).copy()
+                           for j, (column, dtype) in enumerate(cls.COLUMNS)}
+        return state
+
+
+class SnapshotWriter:
+    # Saves snapshots from a background thread so the game loop never waits on disk.
+    # Every file is written to a temporary name and renamed over the old one, so a
+    # crash mid-write leaves the previous snapshot intact. Delta saves go to
+    # "<path>.delta" and only hold what changed since the last full snapshot at path.
+    def __init__(self, path, full_every=6):
+        self.path = path
+        self.delta_path = path + ".delta"
+        self.full_every = full_every
+        self._base = None
+        self._base_id = 0
+        self._next_id = 1
+        self._deltas = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, state, delta=False):
+        self._queue.put((state, delta))
+
+    def flush(self):
+        # Block until every queued snapshot is on disk
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            try:
+                self._write(*item)
+            except (OSError, ValueError, struct.error) as error:
+                # Report and keep the thread alive for the next save; a state that cannot
+                # be encoded (a value out of range for its field) is skipped
+                print(f"Could not save game state to {self.path}: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, state, delta):
+        snapshot_id = self._next_id
+        self._next_id += 1
+        if delta and self._base is not None and self._deltas < self.full_every:
+            data, _ = SnapshotCodec.encode(state, snapshot_id, self._base, self._base_id)
+            self._replace(self.delta_path, data)
+            self._deltas += 1
+        else:
+            data, base = SnapshotCodec.encode(state, snapshot_id)
+            self._replace(self.path, data)
+            # Only a full snapshot that reached the disk can be the base for deltas
+            self._base = base
+            self._base_id = snapshot_id
+            self._deltas = 0
+            # A delta from an older base no longer applies
+            if os.path.exists(self.delta_path):
+                os.remove(self.delta_path)
+
+    @staticmethod
+    def _replace(path, data):
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path):
+        # The full snapshot at path, with its delta applied when there is a matching one
+        with open(path, "rb") as file:
+            flags, snapshot_id, _, sections = SnapshotCodec.read(file.read())
+        if flags & SnapshotCodec.DELTA:
+            raise ValueError("expected a full snapshot")
+        try:
+            with open(path + ".delta", "rb") as file:
+                _, _, base_id, delta = SnapshotCodec.read(file.read())
+            if base_id == snapshot_id:
+                sections = SnapshotCodec.apply(sections, delta)
+        except FileNotFoundError:
+            pass
+        return SnapshotCodec.decode(sections)
+
+
+class ReplayRecorder:
+    # Records one game as its seed plus a bit-packed input stream: four bits per frame
+    # (left, right, fire, start), two frames per byte. Inputs are buffered and handed
+    # to a writer thread in small chunks, together with a full state keyframe every
+    # keyframe_interval frames so playback can seek without re-simulating from frame 0.
+    # Frame governor throttle changes are recorded too, since they change spawning.
+    MAGIC = b"SGRP"
+    VERSION = 4
+    HEADER = struct.Struct("<4sHQI")
+    CHUNK = struct.Struct("<cII")
+
+    def __init__(self, path, seed, keyframe_interval=600, chunk_frames=120):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self._chunk_start = 0
+        self._pending = []
+        self._throttle_level = None
+        self._queue = queue.Queue()
+        self._file = open(path, "wb")
+        self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, seed, keyframe_interval))
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _write_chunks(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            self._file.write(chunk)
+            self._file.flush()
+        self._file.close()
+
+    def _flush_inputs(self):
+        if not self._pending:
+            return
+        packed = bytearray((len(self._pending) + 1) // 2)
+        for i, bits in enumerate(self._pending):
+            packed[i // 2] |= bits << (4 * (i % 2))
+        self._queue.put(self.CHUNK.pack(b"I", self._chunk_start, len(self._pending)) + bytes(packed))
+        self._chunk_start = self.frames
+        self._pending = []
+
+    def record(self, game, inputs):
+        # Call once per frame with the inputs about to be passed to game.step
+        if self.frames % self.keyframe_interval == 0:
+            self._flush_inputs()
+            state, _ = SnapshotCodec.encode(game.capture_state(), self.frames)
+            self._queue.put(self.CHUNK.pack(b"K", self.frames, len(state)) + state)
+        if game.throttle_level != self._throttle_level:
+            # The level travels in the length field; the chunk has no payload
+            self._throttle_level = game.throttle_level
+            self._queue.put(self.CHUNK.pack(b"G", self.frames, game.throttle_level))
+        self._pending.append(bool(inputs.left) | bool(inputs.right) << 1 | bool(inputs.fire) << 2
+                             | bool(inputs.start) << 3)
+        self.frames += 1
+        if len(self._pending) >= self.chunk_frames:
+            self._flush_inputs()
+
+    def close(self):
+        self._flush_inputs()
+        self._queue.put(None)
+        self._writer.join()
+
+
+class ReplayPlayer:
+    # Reads a file written by ReplayRecorder and replays it through Game.step as fast
+    # as the simulation runs, starting from the nearest keyframe
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, self.seed, self.keyframe_interval = ReplayRecorder.HEADER.unpack_from(data)
+        if magic != ReplayRecorder.MAGIC or version != ReplayRecorder.VERSION:
+            raise ValueError(f"{path} is not a version {ReplayRecorder.VERSION} replay file")
+
+        inputs = bytearray()
+        self.keyframes = {}
+        self.throttle_levels = {}
+        offset = ReplayRecorder.HEADER.size
+        while offset < len(data):
+            tag, frame, length = ReplayRecorder.CHUNK.unpack_from(data, offset)
+            offset += ReplayRecorder.CHUNK.size
+            if tag == b"K":
+                self.keyframes[frame] = data[offset:offset + length]
+                offset += length
+            elif tag == b"G":
+                self.throttle_levels[frame] = length
+            else:
+                packed = np.frombuffer(data, dtype=np.uint8, count=(length + 1) // 2, offset=offset)
+                nibbles = np.empty(len(packed) * 2, dtype=np.uint8)
+                nibbles[0::2] = packed & 0x0F
+                nibbles[1::2] = packed >> 4
+                inputs += nibbles[:length].tobytes()
+                offset += len(packed)
+        self.inputs = bytes(inputs)
+        self.frames = len(self.inputs)
+
+    def frame_input(self, frame):
+        bits = self.inputs[frame]
+        return FrameInput(bool(bits & 1), bool(bits & 2), bool(bits & 4), bool(bits & 8))
+
+    def seek(self, game, frame):
+        # Restore the state at the start of frame from the closest earlier keyframe.
+        # A recording closed before its first tick has no keyframes; it starts from
+        # a fresh game with the recorded seed.
+        frame = max(0, min(frame, self.frames))
+        keyframe = max((k for k in self.keyframes if k <= frame), default=None)
+        if keyframe is None:
+            game.reset(self.seed)
+            keyframe = 0
+        else:
+            game.restore_state(SnapshotCodec.decode(SnapshotCodec.read(self.keyframes[keyframe])[3]))
+        self.play(game, keyframe, frame)
+        return frame
+
+    def play(self, game, start, stop):
+        throttle_levels = self.throttle_levels
+        for frame in range(start, stop):
+            if frame in throttle_levels:
+                game.throttle_level = throttle_levels[frame]
+            game.step(self.frame_input(frame))
+
+
+class GameInitializer:
+    def __init__(self, screen_width, screen_height, headless=False, fullscreen=False, integer_scale=False,
+                 vsync=True, scaled=True):
+        # Headless runs use SDL's dummy video driver so no window or display is needed
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+        # Initialize the game
+        pygame.init()
+
+        # Set up the display. screen_width and screen_height are the logical resolution;
+        # every game coordinate is in these units whatever the size of the window.
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.display = ScaledDisplay(self.screen_width, self.screen_height, fullscreen=fullscreen,
+                                     integer_scale=integer_scale, vsync=vsync, headless=headless,
+                                     scaled=scaled)
+        self.screen = self.display.surface
+        pygame.display.set_caption("Spaceship Game")
+
+        # Define colors
+        self.BLACK = (0, 0, 0)
+        self.WHITE = (255, 255, 255)
+        self.GREEN = (0, 255, 0)
+        self.RED = (255, 0, 0)
+        self.BLUE = (0, 0, 255)
+
+        # Load images. Everything a game can show is loaded here, so nothing is read
+        # from disk or decoded in the middle of a frame.
+        self.assets = AssetManager()
+        spaceship_width, spaceship_height = self.assets.load("spaceship.png").get_size()
+        self.spaceship_width = int(spaceship_width * 0.3)  # Reduce width by 70%
+        self.spaceship_height = int(spaceship_height * 0.3)  # Reduce height by 70%
+        self.asteroid_img = self.assets.load("asteroid.png")
+
+        # Set up the spaceship
+        self.spaceship_x = self.screen_width // 2 - self.spaceship_width // 2
+        self.spaceship_y = self.screen_height - self.spaceship_height - 10
+        self.spaceship_speed = 5
+        # Moved in place each frame rather than rebuilt for every collision check
+        self.spaceship_rect = pygame.Rect(self.spaceship_x, self.spaceship_y, self.spaceship_width,
+                                          self.spaceship_height)
+
+        # Set up asteroids
+        self.n_asteroids = 0
+        self.asteroids = EntityStore()
+        self.asteroid_speed = 2
+        self.asteroid_hp = 3  # Only weapon entities wear this down; bullets destroy an asteroid outright
+        self.asteroid_spawn_delay = 60  # Increase this value to decrease the frequency of asteroid spawns
+        self.max_asteroid_size = min(self.screen_width, self.screen_height) // 3  # Maximum asteroid size is 30% of the screen size
+        # Asteroid spawns the frame governor holds back, released once there is room again
+        self.throttle_level = 0
+        self.deferred_spawns = 0
+        self.max_deferred_spawns = 20
+        self.spawn_cooldown = 0
+
+        # bullet sound
+        # bullet_sound = pygame.mixer.Sound("bullet_sound.wav")
+        self.bullets = EntityStore()
+
+        # Set up power-ups
+        self.powerups = EntityStore()
+        self.powerup_spawn_delay = 600  # Increase this value to decrease the frequency of power-up spawns
+        self.max_powerup_size = min(self.screen_width, self.screen_height) // 2  # Maximum power-up size is 50% of the screen size
+
+        # Define initial power and power increment
+        self.power = 100
+        self.power_increment = 50
+
+        # Set up shields
+        self.shielded = False
+        self.shield_duration = 5 * 60  # 5 seconds at 60 FPS
+        self.shield_time = 0
+
+        # Set up weapons
+        self.weapons = EntityStore()
+        self.weapon_levels = {
+            1: {"image": "weapon_level1.png", "damage": 3, "timer": 5 * 60},  # 5 seconds at 60 FPS
+            2: {"image": "weapon_level2.png", "damage": 2, "timer": 5 * 60},
+            3: {"image": "weapon_level3.png", "damage": 1, "timer": 10 * 60}  # 10 seconds at 60 FPS
+        }
+        self.current_weapon_level = 0
+        self.weapon_timer = 0
+
+        # Game logic draws from its own generator so each game can be replayed from its seed
+        self.rng = GameRandom()
+        self.game_seed = 0
+        self.recorder = None
+        self.replay_path = None
+        self.replays_recorded = 0
+
+        # Save states are written by a SnapshotWriter thread; autosave is off unless set
+        self.snapshots = None
+        self.save_path = "game_state.bin"
+        self.autosave_interval = None
+        self.frames_since_save = 0
+
+        # Game variables
+        self.score = 0
+        self.score_timer = 0
+        self.game_over = False
+        self.game_running = False
+        self.scene = None
+        self.scene_timer = 0
+        self.quit_requested = False
+
+        # The simulation advances in fixed ticks of 1/60 s; every speed and timer above
+        # is per tick. The display draws up to fps frames a second (0 for no cap) and
+        # interpolates between ticks, so game speed does not depend on the frame rate.
+        # With vsync the display's refresh paces the frames instead of a cap. The title and
+        # game over scenes draw once and present nothing after that, so nothing would pace
+        # them; they are capped at menu_fps (or fps, if set) instead.
+        self.clock = pygame.time.Clock()
+        self.fps = 0 if self.display.vsync else 60
+        self.menu_fps = 60
+        self.tick_seconds = 1 / 60
+        self.max_catchup_ticks = 5  # After a stall, run at most this many ticks in one frame
+        self.accumulator = 0.0
+        self.pending_fire = False
+        self.prev_spaceship_x = self.spaceship_x
+
+        self.weapon_width = 50  # Set the desired width of the weapon images
+        self.weapon_height = 50  # Set the desired height of the weapon images
+
+        # The spaceship and the weapon icons drawn next to it share one atlas surface
+        sprite_keys = [("spaceship.png", (self.spaceship_width, self.spaceship_height))]
+        for level in sorted(self.weapon_levels):
+            sprite_keys.append((self.weapon_levels[level]["image"], (self.weapon_width, self.weapon_height)))
+        for path, size in sprite_keys:
+            self.assets.load(path, size)
+        self.assets.pack_atlas(sprite_keys)
+        for path, _ in sprite_keys:
+            self.assets.unload(path)
+        self.spaceship_img = self.assets.load(*sprite_keys[0])
+        self.weapon_imgs = [self.assets.load(path, size) for path, size in sprite_keys[1:]]
+
+        # Power-ups spawn about every 10 seconds and the "power" one raises the shield, so
+        # both are needed in nearly every game
+        self.powerup_imgs = [self.assets.load(path) for path in POWERUP_IMAGES]
+        self.shield_img = self.assets.load("shield.png", (self.spaceship_width + 20, self.spaceship_height + 20))
+        self.assets.unload("shield.png")
+
+        # Static background layer, scaled and converted to the display format once
+        self.background_img = self.assets.load("background.png", (self.screen_width, self.screen_height))
+        self.assets.unload("background.png")
+        self.renderer = LayeredRenderer(self.screen, self.background_img, self.display)
+
+        # Fonts and HUD labels are loaded and rendered once, then reused every frame
+        self.hud = HudText()
+
+        # Per-phase frame timings, off unless --profile or F3 turns them on
+        self.profiler = FrameProfiler()
+        self.profile_path = "profile.json"
+
+        # Broad-phase grid for bullet and weapon collisions; the spaceship is a single rect
+        # and is checked against every asteroid and power-up in one vectorized pass
+        self.collision_world = CollisionWorld(cell_size=64)
+
+        # Scaled asteroid and power-up sprites, bucketed so random sizes share surfaces
+        self.sprite_buckets = 24
+        self.sprite_cache = SpriteCache(max_entries=128, buckets=self.sprite_buckets, min_size=10,
+                                        max_size=max(self.max_asteroid_size, self.max_powerup_size))
+
+        # Throttles spawning and render quality when frames run over budget
+        self.governor = FrameGovernor()
+        self.governor_path = None
+
+
+class GameStateManager:
+    def capture_state(self):
+        # Everything step() reads or writes, including the random generator
+        return {
+            "rng": self.rng.getstate(),
+            "game_seed": self.game_seed,
+            "spaceship_x": self.spaceship_x,
+            "power": self.power,
+            "score": self.score,
+            "score_timer": self.score_timer,
+            "game_over": self.game_over,
+            "n_asteroids": self.n_asteroids,
+            "asteroid_speed": self.asteroid_speed,
+            "current_weapon_level": self.current_weapon_level,
+            "weapon_timer": self.weapon_timer,
+            "shielded": self.shielded,
+            "shield_time": self.shield_time,
+            "throttle_level": self.throttle_level,
+            "deferred_spawns": self.deferred_spawns,
+            "spawn_cooldown": self.spawn_cooldown,
+            "asteroids": self.asteroids.snapshot(),
+            "powerups": self.powerups.snapshot(),
+            "bullets": self.bullets.snapshot(),
+            "weapons": self.weapons.snapshot()
+        }
+
+    def restore_state(self, state):
+        self.rng.setstate(state["rng"])
+        for name in ("asteroids", "powerups", "bullets", "weapons"):
+            getattr(self, name).restore(state[name])
+        for name, value in state.items():
+            if name not in ("rng", "asteroids", "powerups", "bullets", "weapons"):
+                setattr(self, name, value)
+
+    def save_game_state(self, file_path, delta=False):
+        # Hands a copy of the state to the snapshot writer thread and returns at once
+        if self.snapshots is None or self.snapshots.path != file_path:
+            if self.snapshots is not None:
+                self.snapshots.close()
+            self.snapshots = SnapshotWriter(file_path)
+        self.snapshots.save(self.capture_state(), delta=delta)
+
+    def load_game_state(self, file_path):
+        try:
+            self.restore_state(SnapshotWriter.load(file_path))
+        except FileNotFoundError:
+            # Handle the case when the file doesn't exist or cannot be loaded
+            print("Game state file not found. Starting a new game.")
+        except ValueError as error:
+            print(f"Game state file could not be loaded ({error}). Starting a new game.")
+
+
+class Game(GameInitializer, GameStateManager):
+    def __init__(self, headless=False, fullscreen=False, integer_scale=False, vsync=True, scaled=True):
+        super().__init__(800, 600, headless=headless, fullscreen=fullscreen, integer_scale=integer_scale,
+                         vsync=vsync, scaled=scaled)
+
+    def reset(self, seed=None):
+        # Each game gets its own seed so that it can be replayed
+        self.game_seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng.seed(self.game_seed)
+        self.power = 100
+        self.game_running = True
+        self.score = 0
+        self.score_timer = 0
+        self.game_over = False
+        self.current_weapon_level = 0
+        self.weapon_timer = 0
+        self.shielded = False
+        self.shield_time = 0
+        self.spaceship_x = self.screen_width // 2 - self.spaceship_width // 2
+        self.deferred_spawns = 0
+        self.spawn_cooldown = 0
+        self.asteroids.clear()
+        self.powerups.clear()
+        self.weapons.clear()
+        self.bullets.clear()
+
+    def start_game(self):
+        self.reset()
+        self.start_recording()
+        self.set_scene(SCENE_PLAYING)
+
+    def show_message(self, text):
+        # Full-screen message for the title and game over scenes
+        self.screen.fill(self.BLACK)
+        label = self.hud.label(text, self.WHITE)
+        self.screen.blit(label, label.get_rect(center=(self.screen_width // 2, self.screen_height // 2)))
+        self.display.flip()
+
+    def set_scene(self, scene):
+        # Switch scenes; menus are drawn once on entry and left on screen
+        self.scene = scene
+        self.game_running = scene == SCENE_PLAYING
+        if scene == SCENE_TITLE:
+            self.show_message("Press Enter to Start")
+        elif scene == SCENE_PLAYING:
+            self.accumulator = 0.0
+            self.pending_fire = False
+        elif scene == SCENE_GAME_OVER:
+            self.show_message(f"Game Over - Score: {self.score}")
+            self.scene_timer = 2.0  # Show the score for 2 seconds
+        self.renderer.invalidate()
+
+    def start_recording(self):
+        # Record each game to its own file, e.g. replay.bin -> replay_3.bin
+        self.stop_recording()
+        if self.replay_path:
+            root, extension = os.path.splitext(self.replay_path)
+            self.replays_recorded += 1
+            self.recorder = ReplayRecorder(f"{root}_{self.replays_recorded}{extension}", self.game_seed)
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def draw_power_meter(self):
+        power_meter_width = 200
+        power_meter_height = 20
+        power_meter_x = self.screen_width // 2 - power_meter_width // 2
+        power_meter_y = 10
+
+        # Calculate the width of the power meter fill based on the current power value;
+        # power keeps growing past 100, but the fill stops at the outline
+        power_fill_width = min(int((self.power / 100) * power_meter_width), power_meter_width)
+
+        # Draw the power meter outline
+        outline = pygame.draw.rect(self.screen, self.WHITE,
+                                   (power_meter_x, power_meter_y, power_meter_width, power_meter_height), 2)
+
+        # Draw the power meter fill
+        fill = pygame.draw.rect(self.screen, self.GREEN,
+                                (power_meter_x, power_meter_y, power_fill_width, power_meter_height))
+        return outline.union(fill)
+
+    def collect_powerup(self, powerup_type):
+        if powerup_type == "gem":
+            self.score += 10
+            self.power += self.power_increment  # Increase power by power_increment when collecting a gem power-up
+        elif powerup_type == "power":
+            self.shielded = True
+            self.shield_time = self.shield_duration
+        elif powerup_type == "weapon":
+            # Cycle through weapon levels 1 -> 2 -> 3 -> 1
+            self.current_weapon_level = self.current_weapon_level % len(self.weapon_levels) + 1
+            self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
+
+    def resolve_collisions(self, spaceship_rect):
+        # Broad phase: hash asteroids and power-ups into the grid once per frame
+        world = self.collision_world
+        world.rebuild({"asteroids": self.asteroids, "powerups": self.powerups})
+
+        # Removals are deferred until every pair has been resolved
+        dead_bullets = set()
+        dead_asteroids = set()
+        dead_weapons = set()
+
+        # Bullets destroy the first asteroid they hit
+        if self.bullets.count:
+            bullet_hits, asteroid_hits = world.overlapping(self.bullets, "asteroids")
+            for bullet_index, asteroid_index in zip(bullet_hits.tolist(), asteroid_hits.tolist()):
+                if bullet_index in dead_bullets or asteroid_index in dead_asteroids:
+                    continue
+                dead_bullets.add(bullet_index)
+                dead_asteroids.add(asteroid_index)
+                self.score += 10
+
+        # Weapons wear asteroids down by the damage of the current weapon level
+        if self.weapons.count:
+            damage = self.weapon_levels.get(self.current_weapon_level, {}).get("damage", 1)
+            hp = self.asteroids.hp
+            weapon_hits, asteroid_hits = world.overlapping(self.weapons, "asteroids")
+            for weapon_index, asteroid_index in zip(weapon_hits.tolist(), asteroid_hits.tolist()):
+                if weapon_index in dead_weapons or asteroid_index in dead_asteroids:
+                    continue
+                dead_weapons.add(weapon_index)
+                hp[asteroid_index] -= damage
+                if hp[asteroid_index] <= 0:
+                    dead_asteroids.add(asteroid_index)
+                    self.score += 10
+
+        # Check for collision with asteroids
+        for asteroid_index in world.overlapping_rect(spaceship_rect, "asteroids").tolist():
+            if asteroid_index in dead_asteroids:
+                continue
+            if self.shielded:
+                dead_asteroids.add(asteroid_index)
+                self.score += 10
+                self.n_asteroids += 1
+            else:
+                self.power -= 50  # Decrease power by 50 for each asteroid collision
+                if self.power <= 0:
+                    self.game_over = True
+
+        # Check for collision with power-ups
+        dead_powerups = world.overlapping_rect(spaceship_rect, "powerups")
+        for kind in self.powerups.kind[dead_powerups].tolist():
+            self.collect_powerup(POWERUP_TYPES[kind])
+
+        self.bullets.remove_indices(list(dead_bullets))
+        self.asteroids.remove_indices(list(dead_asteroids))
+        self.weapons.remove_indices(list(dead_weapons))
+        self.powerups.remove_indices(dead_powerups)
+
+    def read_inputs(self):
+        # Poll the keyboard into a FrameInput; fire is set by a SPACE keydown this frame
+        fire = False
+        start = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit_requested = True
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN:
+                    start = True
+                if event.key == pygame.K_SPACE:
+                    fire = True
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                    self.renderer.invalidate()
+                if event.key == pygame.K_F4 and self.profiler.enabled:
+                    self.export_profile(self.profile_path)
+        keys = pygame.key.get_pressed()
+        return FrameInput(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], fire, start)
+
+    def handle_input(self, inputs):
+        if inputs.left:
+            self.spaceship_x -= self.spaceship_speed
+        if inputs.right:
+            self.spaceship_x += self.spaceship_speed
+
+        # Update the spaceship position
+        if self.spaceship_x < 0:
+            self.spaceship_x = 0
+        elif self.spaceship_x > self.screen_width - self.spaceship_width:
+            self.spaceship_x = self.screen_width - self.spaceship_width
+
+        if inputs.fire and self.current_weapon_level > 0:
+            bullet_x = self.spaceship_x + self.spaceship_width // 2
+            self.bullets.add(bullet_x, self.spaceship_y, 5, 10)
+            # bullet_sound.play()
+
+    def spawn_entities(self):
+        # Spawn asteroids. While the frame governor throttles, a spawn that would go over
+        # its cap on live asteroids or come sooner than its spawn gap waits in
+        # deferred_spawns; unthrottled, every spawn happens on the frame it is rolled.
+        limits = FrameGovernor.LEVELS[self.throttle_level]
+        if self.spawn_cooldown > 0:
+            self.spawn_cooldown -= 1
+        if self.rng.randint(0, self.asteroid_spawn_delay) == 0:
+            self.deferred_spawns = min(self.deferred_spawns + 1, self.max_deferred_spawns)
+        max_asteroids = limits["max_asteroids"]
+        room = max_asteroids is None or self.asteroids.count < max_asteroids
+        if self.deferred_spawns and self.spawn_cooldown == 0 and room:
+            self.deferred_spawns -= 1
+            self.spawn_cooldown = limits["spawn_gap"]
+            asteroid_width = self.rng.randint(10, self.max_asteroid_size)
+            asteroid_x = self.rng.randint(0, self.screen_width - asteroid_width)
+            asteroid_y = self.rng.randint(-self.screen_height, -asteroid_width)
+            self.asteroids.add(asteroid_x, asteroid_y, asteroid_width, asteroid_width, hp=self.asteroid_hp)
+
+        # Spawn power-ups
+        if self.rng.randint(0, self.powerup_spawn_delay) == 0:
+            powerup_kind = self.rng.randrange(len(POWERUP_TYPES))
+            powerup_width = self.rng.randint(10, self.max_powerup_size)
+            powerup_x = self.rng.randint(0, self.screen_width - powerup_width)
+            powerup_y = self.rng.randint(-self.screen_height, -powerup_width)
+            self.powerups.add(powerup_x, powerup_y, powerup_width, powerup_width, kind=powerup_kind)
+
+    def move_entities(self):
+        # Move and remove asteroids; each one that leaves the screen scores a point
+        self.asteroids.move(0, self.asteroid_speed)
+        passed = self.asteroids.remove(self.asteroids.below(self.screen_height))
+        self.score += passed
+        self.n_asteroids += passed
+
+        # Move and remove weapons
+        self.weapons.move(0, -(self.asteroid_speed - 1))
+        self.weapons.remove(self.weapons.above(0))
+
+        # move and remove bullets
+        self.bullets.move(0, -5)  # Adjust the bullet speed as needed
+        self.bullets.remove(self.bullets.above(0))
+
+        # Move and remove power-ups
+        self.powerups.move(0, self.asteroid_speed)
+        self.powerups.remove(self.powerups.below(self.screen_height))
+
+    def update_timers(self):
+        # Update weapon timer
+        if self.weapon_timer > 0:
+            self.weapon_timer -= 1
+
+        # Check if weapon timer has expired
+        if self.weapon_timer == 0:
+            self.current_weapon_level = 0
+
+        if self.current_weapon_level == 3 and self.asteroids.count == 0:
+            self.level = 1
+            self.current_weapon_level = 3
+            self.weapon_timer = self.weapon_levels[self.current_weapon_level]["timer"]
+            self.asteroid_speed = 2
+
+        # Update shield timer
+        if self.shielded:
+            self.shield_time -= 1
+            if self.shield_time <= 0:
+                self.shielded = False
+
+    def step(self, inputs):
+        # Advance the game by one tick without touching the display
+        profiler = self.profiler
+        self.prev_spaceship_x = self.spaceship_x
+        for store in (self.asteroids, self.powerups, self.bullets, self.weapons):
+            store.store_previous()
+        self.handle_input(inputs)
+        profiler.mark("events")
+        self.spawn_entities()
+        profiler.mark("spawn")
+        self.move_entities()
+        profiler.mark("move")
+        self.spaceship_rect.x = self.spaceship_x
+        self.resolve_collisions(self.spaceship_rect)
+        profiler.mark("collide")
+        self.update_timers()
+        profiler.mark("timers")
+
+    def draw(self, alpha=1.0):
+        # alpha is how far the display is between the last two ticks; entities are drawn
+        # that far between their previous and current positions
+        renderer = self.renderer
+        spaceship_x = self.prev_spaceship_x + (self.spaceship_x - self.prev_spaceship_x) * alpha
+        # The shield halo and the collected weapon icons are decorative; the HUD shows
+        # the same information, so the governor drops them when throttling
+        decorations = self.governor.settings["decorations"]
+        if self.shielded and decorations:
+            # The shield surrounds the spaceship with a 10 pixel margin on each side
+            renderer.blit(self.shield_img, spaceship_x - 10, self.spaceship_y - 10)
+        # Bucketed sprites are centred on their hitboxes
+        for x, y, w, h, _, _ in self.asteroids.rows(alpha):
+            sprite = self.sprite_cache.get(self.asteroid_img, w, h)
+            renderer.blit(sprite, x + (w - sprite.get_width()) / 2, y + (h - sprite.get_height()) / 2)
+        for x, y, w, h, kind, _ in self.powerups.rows(alpha):
+            sprite = self.sprite_cache.get(self.powerup_imgs[kind], w, h)
+            renderer.blit(sprite, x + (w - sprite.get_width()) / 2, y + (h - sprite.get_height()) / 2)
+
+        # Draw the spaceship
+        renderer.blit(self.spaceship_img, spaceship_x, self.spaceship_y)
+
+        for x, y, w, h, _, _ in self.bullets.rows(alpha):
+            renderer.fill(self.BLUE, x, y, w, h)
+
+        weapon_offset = self.spaceship_width  # Offset to position the collected weapons
+        for weapon_level in range(self.current_weapon_level if decorations else 0):
+            weapon_img = self.weapon_imgs[weapon_level]
+            renderer.blit(weapon_img, spaceship_x + weapon_offset, self.spaceship_y)
+            weapon_offset += weapon_img.get_width()
+
+        # Draw weapons
+        for x, y, w, h, _, _ in self.weapons.rows(alpha):
+            renderer.fill(self.RED, x, y, w, h)
+
+        # HUD layer: each element is redrawn only when its value changes
+        hud = self.hud
+        screen = self.screen
+        if self.shielded:
+            shield_seconds = self.shield_time // 60
+            renderer.hud("shield", shield_seconds, lambda: hud.draw_field(
+                screen, "Shield Time: ", shield_seconds, "s", (10, 50), self.WHITE))
+
+        # Display current weapon level and timer
+        if self.current_weapon_level != 0:
+            weapon_level = self.current_weapon_level
+            weapon_seconds = self.weapon_timer // 60
+            renderer.hud("weapon_level", weapon_level, lambda: hud.draw_field(
+                screen, "Weapon Level: ", weapon_level, "", (600, 10), self.WHITE))
+            renderer.hud("weapon_timer", weapon_seconds, lambda: hud.draw_field(
+                screen, "Weapon Timer: ", weapon_seconds, "s", (600, 50), self.WHITE))
+
+        # Display score
+        score = self.score
+        renderer.hud("score", score, lambda: hud.draw_field(
+            screen, "Score: ", score, "", (10, 10), self.WHITE))
+
+        # Render power meter
+        renderer.hud("power", self.power, self.draw_power_meter)
+
+        # Shown only while the frame governor is throttling
+        throttle = self.governor.level
+        if throttle:
+            renderer.hud("throttle", throttle, lambda: hud.draw_field(
+                screen, "Throttle: ", throttle, "", (600, 90), self.WHITE))
+
+        if self.profiler.show_overlay:
+            renderer.blit(self.profiler.render_overlay(hud), 10, self.screen_height - 240)
+        self.profiler.mark("draw")
+
+        renderer.present()
+        self.profiler.mark("present")
+
+    def export_profile(self, path):
+        # Sprite cache hit rates go with the frame timings, to tune the bucket count
+        self.profiler.export(path, {"sprite_cache": self.sprite_cache.stats()})
+
+    def apply_throttle(self):
+        # Takes effect from the next frame. The throttle level is part of the game state
+        # because it changes spawning, so replays record it.
+        settings = self.governor.settings
+        self.throttle_level = self.governor.level
+        self.sprite_cache.buckets = max(1, int(self.sprite_buckets * settings["sprite_detail"]))
+
+    def update_title(self, inputs, dt):
+        if inputs.start:
+            self.start_game()
+
+    def update_playing(self, inputs, dt):
+        # Run as many fixed ticks as the time since the last frame covers, then draw
+        # once, interpolated between the last two ticks
+        if inputs.start:
+            self.start_game()
+        # A SPACE press on a frame that runs no tick fires on the next tick instead
+        self.pending_fire = self.pending_fire or inputs.fire
+        self.accumulator += dt
+        ticks = 0
+        while self.accumulator >= self.tick_seconds and not self.game_over:
+            if ticks == self.max_catchup_ticks:
+                # Too far behind after a stall: drop the backlog so the game slows down
+                # for a moment instead of spending every later frame catching up
+                self.accumulator = 0.0
+                break
+            # Presses count on the first tick of the frame only; held keys on every tick
+            tick_inputs = inputs._replace(fire=self.pending_fire, start=inputs.start and ticks == 0)
+            self.pending_fire = False
+            if self.recorder:
+                self.recorder.record(self, tick_inputs)
+            self.step(tick_inputs)
+            self.accumulator -= self.tick_seconds
+            ticks += 1
+            self.frames_since_save += 1
+            if self.autosave_interval and self.frames_since_save >= self.autosave_interval:
+                self.save_game_state(self.save_path, delta=True)
+                self.frames_since_save = 0
+        self.draw(min(1.0, self.accumulator / self.tick_seconds))
+
+        # Game over logic
+        if self.game_over:
+            self.stop_recording()
+            self.save_game_state(self.save_path)
+            self.set_scene(SCENE_GAME_OVER)
+
+    def update_game_over(self, inputs, dt):
+        # Wait before returning to the title screen
+        self.scene_timer -= dt
+        if self.scene_timer <= 0:
+            self.set_scene(SCENE_TITLE)
+
+    def game_loop(self):
+        # One flat loop for the whole session: poll events once per frame, let the
+        # current scene update with the time since the last frame, then cap the frame
+        # rate. Restarting a game only switches scenes, so the stack never grows.
+        scenes = {
+            SCENE_TITLE: self.update_title,
+            SCENE_PLAYING: self.update_playing,
+            SCENE_GAME_OVER: self.update_game_over
+        }
+        if self.scene is None:
+            self.set_scene(SCENE_TITLE)
+        last = time.perf_counter()
+        while not self.quit_requested:
+            self.profiler.begin_frame()
+            started = time.perf_counter()
+            dt = started - last
+            last = started
+            inputs = self.read_inputs()
+            self.renderer.update_started = None
+            scenes[self.scene](inputs, dt)
+            if self.scene == SCENE_PLAYING:
+                # The governor times the frame's work only: the display update can block
+                # on vsync, which would read as an over-budget frame
+                ended = self.renderer.update_started or time.perf_counter()
+                if self.governor.record((ended - started) * 1000):
+                    self.apply_throttle()
+                self.clock.tick(self.fps)
+            else:
+                self.clock.tick(self.fps or self.menu_fps)
+            self.profiler.mark("tick")
+            self.profiler.end_frame()
+
+        self.stop_recording()
+        if self.snapshots is not None:
+            self.snapshots.close()
+        if self.governor_path:
+            with open(self.governor_path, "w") as file:
+                json.dump(self.governor.report(), file, indent=2)
+        pygame.quit()
+
+    def run_headless(self, frames, policy=None):
+        # Simulate frames as fast as possible with no drawing and no frame cap,
+        # restarting whenever a game ends. policy(game) returns a FrameInput.
+        policy = policy or random_policy
+        scores = []
+        self.reset()
+        self.start_recording()
+        started = time.perf_counter()
+        for _ in range(frames):
+            self.profiler.begin_frame()
+            inputs = policy(self)
+            if self.recorder:
+                self.recorder.record(self, inputs)
+            self.step(inputs)
+            self.profiler.end_frame()
+            if self.game_over:
+                scores.append(self.score)
+                self.reset()
+                self.start_recording()
+        self.stop_recording()
+        elapsed = time.perf_counter() - started
+        summary = {
+            "frames": frames,
+            "games": len(scores),
+            "scores": scores,
+            "seconds": elapsed,
+            "fps": frames / elapsed if elapsed else 0.0
+        }
+        if self.profiler.enabled:
+            summary["profile"] = self.profiler.percentiles()
+        return summary
+
+
+class SaveableGame(Game):
+    def __init__(self, headless=False, fullscreen=False, integer_scale=False, vsync=True, scaled=True):
+        super().__init__(headless=headless, fullscreen=fullscreen, integer_scale=integer_scale, vsync=vsync,
+                         scaled=scaled)
+        self.autosave_interval = 10 * 60  # Autosave a delta snapshot every 10 seconds at 60 FPS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spaceship Game")
+    parser.add_argument("--headless", action="store_true", help="simulate without a display as fast as possible")
+    parser.add_argument("--frames", type=int, default=100000, help="number of frames to simulate when headless")
+    parser.add_argument("--asset-report", action="store_true", help="print load time and memory of each asset")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record per-phase frame timings and export them to PATH (.json or .csv); "
+                             "F3 toggles the overlay and F4 exports while playing")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record every game as a replay; game N is written to PATH with _N before the extension")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded game headless and print its outcome")
+    parser.add_argument("--seek", type=int, default=None, help="with --replay, stop at this frame")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random number generator")
+    parser.add_argument("--fps", type=int, default=None,
+                        help="display frame cap, 0 for none (default: none with vsync, otherwise 60); "
+                             "the game itself always runs at 60 ticks a second")
+    parser.add_argument("--fullscreen", action="store_true", help="scale the 800x600 game up to fill the screen")
+    parser.add_argument("--integer-scale", action="store_true",
+                        help="with --fullscreen, scale by a whole number only and add black bars around the game")
+    parser.add_argument("--no-vsync", action="store_true", help="do not sync frames to the display refresh")
+    parser.add_argument("--no-scale", action="store_true",
+                        help="open a plain 800x600 window without GPU scaling or vsync, so only the changed "
+                             "areas of each frame are copied to the screen (for low-power machines)")
+    parser.add_argument("--no-governor", action="store_true",
+                        help="never throttle spawning or render quality when frames run over budget")
+    parser.add_argument("--governor-log", metavar="PATH",
+                        help="write the frame governor's throttle decisions to PATH as JSON on exit")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    game = SaveableGame(headless=args.headless or args.replay is not None, fullscreen=args.fullscreen,
+                        integer_scale=args.integer_scale, vsync=not args.no_vsync, scaled=not args.no_scale)
+    # Everything allocated so far lives for the whole session; freezing it keeps the
+    # collector from rescanning it, so the collections that still happen stay short
+    gc.freeze()
+    game.replay_path = args.record
+    if args.profile:
+        game.profiler.enabled = True
+        game.profile_path = args.profile
+    if args.fps is not None:
+        game.fps = args.fps
+    game.governor.enabled = not args.no_governor
+    game.governor_path = args.governor_log
+    if args.replay:
+        player = ReplayPlayer(args.replay)
+        started = time.perf_counter()
+        frame = player.seek(game, player.frames if args.seek is None else args.seek)
+        print(json.dumps({
+            "seed": player.seed,
+            "frames": player.frames,
+            "frame": frame,
+            "score": game.score,
+            "power": game.power,
+            "game_over": game.game_over,
+            "seconds": time.perf_counter() - started
+        }))
+    elif args.asset_report:
+        print(json.dumps(game.assets.report(), indent=2))
+    elif args.headless:
+        print(json.dumps(game.run_headless(args.frames)))
+        if args.profile:
+            game.export_profile(args.profile)
+    else:
+        game.start_game()
+        game.game_loop()
@@ -0,0 +1,131 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from main import (Game, GameRandom, ReplayPlayer, ReplayRecorder, SnapshotCodec,  # noqa: E402
+                  SnapshotWriter, random_policy)
+
+STORES = ["asteroids", "powerups", "bullets", "weapons"]
+
+
+@pytest.fixture(scope="module")
+def game():
+    return Game(headless=True)
+
+
+def play(game, seed, frames):
+    # A seeded game that keeps going: power is topped up so it never ends
+    random.seed(seed)
+    game.reset(seed)
+    advance(game, frames)
+
+
+def advance(game, frames):
+    for _ in range(frames):
+        game.power = max(game.power, 100)
+        game.step(random_policy(game))
+
+
+def assert_same_state(actual, expected):
+    assert set(actual) == set(expected)
+    for name, value in expected.items():
+        if name in STORES:
+            for column, values in value.items():
+                np.testing.assert_array_equal(actual[name][column], values, err_msg=f"{name}.{column}")
+        else:
+            assert tuple(actual[name]) == tuple(value) if name == "rng" else actual[name] == value, name
+
+
+def test_full_snapshot_round_trip(game):
+    play(game, 1, 400)
+    state = game.capture_state()
+    data, _ = SnapshotCodec.encode(state, 1)
+    flags, snapshot_id, _, sections = SnapshotCodec.read(data)
+    assert not flags & SnapshotCodec.DELTA
+    assert snapshot_id == 1
+    assert_same_state(SnapshotCodec.decode(sections), state)
+
+
+def test_delta_snapshot_round_trip(game):
+    play(game, 2, 400)
+    _, base = SnapshotCodec.encode(game.capture_state(), 1)
+    advance(game, 45)
+    state = game.capture_state()
+    data, _ = SnapshotCodec.encode(state, 2, base, 1)
+    flags, _, base_id, delta = SnapshotCodec.read(data)
+    assert flags & SnapshotCodec.DELTA
+    assert base_id == 1
+    assert_same_state(SnapshotCodec.decode(SnapshotCodec.apply(base, delta)), state)
+
+
+def test_unchanged_delta_is_header_only(game):
+    play(game, 3, 200)
+    state = game.capture_state()
+    _, base = SnapshotCodec.encode(state, 1)
+    data, _ = SnapshotCodec.encode(state, 2, base, 1)
+    assert len(data) == SnapshotCodec.HEADER.size
+
+
+def test_writer_round_trip_and_bad_state(game, tmp_path):
+    path = str(tmp_path / "state.bin")
+    writer = SnapshotWriter(path)
+    play(game, 4, 300)
+    writer.save(game.capture_state())
+    advance(game, 30)
+    bad = dict(game.capture_state(), rng=(-1, 0))
+    writer.save(bad, delta=True)  # Out of range for its field: reported and skipped
+    state = game.capture_state()
+    writer.save(state, delta=True)
+    writer.flush()
+    writer.close()
+    assert_same_state(SnapshotWriter.load(path), state)
+
+
+def test_game_random_restore():
+    rng = GameRandom(12345)
+    for _ in range(500):
+        rng.randint(0, 799)
+        rng.choice("abc")
+        rng.random()
+        rng.getrandbits(100)
+    state = rng.getstate()
+    expected = [rng.randint(0, 10 ** 6) for _ in range(50)] + [rng.random() for _ in range(50)]
+    restored = GameRandom()
+    restored.setstate(state)
+    assert [restored.randint(0, 10 ** 6) for _ in range(50)] + [restored.random() for _ in range(50)] == expected
+
+
+def record(game, path, seed, frames, keyframe_interval):
+    # Records a game up to frames or game over and returns its state after every frame
+    random.seed(seed)
+    game.reset(seed)
+    recorder = ReplayRecorder(path, game.game_seed, keyframe_interval=keyframe_interval, chunk_frames=37)
+    checkpoints = {}
+    for frame in range(1, frames + 1):
+        if game.game_over:
+            break
+        inputs = random_policy(game)
+        recorder.record(game, inputs)
+        game.step(inputs)
+        checkpoints[frame] = game.capture_state()
+    recorder.close()
+    return checkpoints
+
+
+@pytest.mark.parametrize("keyframe_interval", [100, 10 ** 6])
+def test_replay_seek_matches_playback(game, tmp_path, keyframe_interval):
+    path = str(tmp_path / "game.rpl")
+    checkpoints = record(game, path, 5, 700, keyframe_interval)
+    last = max(checkpoints)
+    assert last >= 300
+    player = ReplayPlayer(path)
+    assert player.frames == last
+    replayed = Game(headless=True)
+    for frame in (1, 99, 100, 101, 250, last):
+        player.seek(replayed, frame)
+        assert_same_state(replayed.capture_state(), checkpoints[frame])